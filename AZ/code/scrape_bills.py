@@ -1,5 +1,4 @@
 import json
-import requests
 import datetime
 import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -7,6 +6,10 @@ import pandas as pd
 import logging
 import os
 from lxml import html
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import http_client
 
 def scrape_bill(uuid, state, state_bill_id, session):
     bill_history_data, last_status, action_ids = scrape_bill_history(uuid, state, state_bill_id, session)
@@ -30,7 +33,7 @@ def scrape_bill_metadata(uuid, state, state_bill_id, session, last_status):
         "https://apps.azleg.gov/api/Bill/?billNumber={}&sessionId={}".format(state_bill_id, session_id)
     )
 
-    page = json.loads(requests.get(bill_json_url, timeout=80).content.decode("utf-8"))
+    page = json.loads(http_client.get(bill_json_url, timeout=80).content.decode("utf-8"))
 
     bill_title = page["ShortTitle"]
     internal_id = page["BillId"]
@@ -58,7 +61,7 @@ def scrape_sponsors(uuid, state, state_bill_id, session, internal_id):
     sponsors_url = "https://apps.azleg.gov/api/BillSponsor/?id={}".format(
         internal_id
     )
-    page = json.loads(requests.get(sponsors_url, timeout=80).content.decode("utf-8"))
+    page = json.loads(http_client.get(sponsors_url, timeout=80).content.decode("utf-8"))
 
 
     sponsors = []
@@ -90,7 +93,7 @@ def scrape_bill_history(uuid, state, state_bill_id, session):
     bill_json_url = (
         "https://apps.azleg.gov/api/BillStatusOverview/?billNumber={}&sessionId={}".format(state_bill_id, session_id)
     )
-    response = requests.get(bill_json_url, timeout=80)
+    response = http_client.get(bill_json_url, timeout=80)
     page = json.loads(response.content.decode("utf-8"))
 
     actions = []
@@ -170,7 +173,7 @@ def scrape_votes(uuid, state, state_bill_id, session, internal_id, action_ids):
         action_url = (
             "https://apps.azleg.gov/api/BillStatusFloorAction/?billStatusId={}&billStatusActionId={}&includeVotes=true".format(internal_id, action_id)
         )
-        response = requests.get(action_url, timeout=80)
+        response = http_client.get(action_url, timeout=80)
         page = json.loads(response.content.decode("utf-8"))
 
         if page:
@@ -4,7 +4,6 @@ import socket
 import urllib.error
 import time
 import suds
-import requests
 from hashlib import sha512
 import pandas as pd
 import json
@@ -12,6 +11,10 @@ import re
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import http_client
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -165,7 +168,7 @@ def get_token():
     token_url = (
         f"https://www.legis.ga.gov/api/authentication/token?key={key}&ms={timestamp}"
     )
-    return "Bearer " + requests.get(token_url).json()
+    return "Bearer " + http_client.get(token_url).json()
 
 def write_file(file_name, directory, data):
     with open(f'GA/output/{directory}/{file_name}.json', 'w') as f:
@@ -8,7 +8,6 @@ Created on Sun Apr 13 11:58:22 2025
 
 import csv
 import re
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import json
@@ -16,6 +15,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 import pandas as pd
 import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import http_client
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -84,7 +87,7 @@ def extractMetadata(url):
     bill_description = ""
     bill_status = ""
     
-    result = requests.get(url)
+    result = http_client.get(url)
     
     if result:
         doc = BeautifulSoup(result.text, "html.parser")
@@ -114,7 +117,7 @@ def extractHistory(url):
 
     bill_history = []
     
-    result = requests.get(url)
+    result = http_client.get(url)
     if result:
         doc = BeautifulSoup(result.text, "html.parser")
         pattern_date_letter = r"[A-Za-z]{3}-\d{2}-\d{4}"
@@ -162,7 +165,7 @@ def extractSponsors(url):
     sponsor_list = []
     isFirstSponsor = True
     
-    result = requests.get(url)
+    result = http_client.get(url)
     if result:
         doc = BeautifulSoup(result.text, "html.parser")
         # extract sponsors of the bill
@@ -203,7 +206,7 @@ def extractVotes(url):
     vote_description = ""
     votelinks = []
     
-    result = requests.get(url)
+    result = http_client.get(url)
     if result:
         doc = BeautifulSoup(result.text, "html.parser")
         
@@ -225,7 +228,7 @@ def extractVotes(url):
                 date_split = date_found[0].split("/")
                 vote_date = date_split[2] + "-" + date_split[0] + "-" + date_split[1]
             
-            billVoteResult = requests.get(newurl)
+            billVoteResult = http_client.get(newurl)
             # Split the content into lines
             lines = billVoteResult.text.splitlines()
 
@@ -1,8 +1,10 @@
-import os, sys, glob, csv, re, json, requests
+import os, sys, glob, csv, re, json
 from datetime import datetime
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+from fetch import fetch, prefetch
+
 def process_basedata(input_dir, output_dir):
     """Add uuid, state, session, state_bill_id."""
     os.makedirs(output_dir, exist_ok=True)
@@ -10,9 +12,10 @@ def process_basedata(input_dir, output_dir):
         rows = []
         with open(json_path, encoding='utf8') as rf:
             data = json.load(rf)
+            prefetch(row.get('HTML Link') or row['Link'] for row in data)
             for row in data:
                 link = row.get('HTML Link') or row['Link']
-                soup = BeautifulSoup(requests.get(link).text, 'html.parser')
+                soup = BeautifulSoup(fetch(link).text, 'html.parser')
                 bid_tag = soup.find('h1')
                 state_bill_id = bid_tag.text.strip() if bid_tag else soup.title.text.strip()
                 state_bill_id = state_bill_id.replace("*","")
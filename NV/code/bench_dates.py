@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark dates.parse_date against the old strptime loop.
+
+The corpus is every string the history parsers hand to parse_date while
+parsing the cached bill pages listed in basedata (run with NV_OFFLINE=1 to
+stay off the network), or the lines of --dates FILE.  Both parsers must
+agree on every string; the timings are for the whole corpus, repeated.
+
+    python NV/code/bench_dates.py --basedata NV/intermediate/basedata
+"""
+import os
+import glob
+import json
+import time
+import argparse
+from datetime import datetime
+from bs4 import BeautifulSoup
+
+import dates
+import history
+from fetch import fetch
+
+LEGACY_FORMATS = [
+    "%m/%d/%y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%b-%d-%Y",
+    "%b.%d,%Y",
+    "%b. %d, %Y",
+]
+
+
+def legacy_parse_date(txt):
+    txt = txt.strip()
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(txt, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return txt
+
+
+def corpus_from_pages(basedata_dir, limit=None):
+    """Every raw string the history parsers pass to parse_date."""
+    seen = []
+    real = history.parse_date
+    history.parse_date = lambda txt: (seen.append(txt), real(txt))[1]
+    try:
+        n = 0
+        for jf in sorted(glob.glob(os.path.join(basedata_dir, "bills_*.json"))):
+            with open(jf, encoding="utf8") as f:
+                rows = json.load(f)
+            for row in rows:
+                if limit and n >= limit:
+                    return seen
+                try:
+                    page = fetch(row["Link"])
+                except Exception:
+                    continue
+                history.parse_history(BeautifulSoup(page.text, "html.parser"), row.get("session", ""))
+                n += 1
+    finally:
+        history.parse_date = real
+    return seen
+
+
+def bench(fn, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for txt in corpus:
+            fn(txt)
+    return time.perf_counter() - start
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--basedata", default="NV/intermediate/basedata")
+    p.add_argument("--dates", help="one raw date string per line, instead of parsing pages")
+    p.add_argument("--limit", type=int, help="only parse this many bill pages")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    if args.dates:
+        with open(args.dates, encoding="utf8") as f:
+            corpus = [line.rstrip("\n") for line in f]
+    else:
+        corpus = corpus_from_pages(args.basedata, args.limit)
+    if not corpus:
+        raise SystemExit("empty corpus: no cached pages / dates found")
+
+    mismatches = [(t, legacy_parse_date(t), dates.parse_date(t))
+                  for t in dict.fromkeys(corpus)
+                  if legacy_parse_date(t) != dates.parse_date(t)]
+    for t, old, new in mismatches[:20]:
+        print(f"MISMATCH {t!r}: strptime={old!r} regex={new!r}")
+
+    total = len(corpus) * args.repeat
+    legacy = bench(legacy_parse_date, corpus, args.repeat)
+    dates._normalize.cache_clear()
+    cold = bench(lambda t: dates._normalize.__wrapped__(t.strip()), corpus, args.repeat)
+    memo = bench(dates.parse_date, corpus, args.repeat)
+
+    print(f"{len(corpus)} dates ({len(set(corpus))} distinct) x {args.repeat}")
+    for label, secs in (("strptime loop", legacy), ("regex dispatch", cold), ("regex + memo", memo)):
+        print(f"  {label:<15} {secs:8.3f}s  {total / secs:12,.0f} dates/s  {legacy / secs:6.1f}x")
+    print(f"{len(mismatches)} mismatches")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
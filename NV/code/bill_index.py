@@ -0,0 +1,160 @@
+import os
+import json
+import sqlite3
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SQLite sidecar index over the combined outputs.
+#
+# The combiner records, for every record it writes, the category, the
+# uuid/state/session/state_bill_id keys and the byte offset + length of the
+# record's JSON in the output file.  query.py then seeks straight to the
+# matching records instead of json.load()ing the whole corpus.
+# ──────────────────────────────────────────────────────────────────────────────
+
+INDEX_NAME = 'bill_index.sqlite'
+KEYS = ('uuid', 'state', 'session', 'state_bill_id')
+
+SCHEMA = """
+CREATE TABLE files (
+    category TEXT PRIMARY KEY,
+    file     TEXT NOT NULL
+);
+CREATE TABLE records (
+    category      TEXT NOT NULL,
+    uuid          TEXT COLLATE NOCASE,
+    state         TEXT COLLATE NOCASE,
+    session       TEXT COLLATE NOCASE,
+    state_bill_id TEXT COLLATE NOCASE,
+    offset        INTEGER NOT NULL,
+    length        INTEGER NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX records_uuid ON records (category, uuid);
+CREATE INDEX records_bill ON records (category, state, session, state_bill_id);
+"""
+
+
+class IndexBuilder:
+    """Collects (category, keys, offset, length) rows and swaps the index in on close()."""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, INDEX_NAME)
+        self.tmp = self.path + '.tmp'
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+        self.conn = sqlite3.connect(self.tmp)
+        self.conn.executescript(SCHEMA)
+        self.rows = []
+
+    def add_file(self, category, file_name):
+        self.conn.execute("INSERT INTO files VALUES (?, ?)", (category, file_name))
+
+    def add(self, category, rec, offset, length):
+        keys = [str(rec.get(k, '')) if isinstance(rec, dict) else '' for k in KEYS]
+        self.rows.append((category, *keys, offset, length))
+        if len(self.rows) >= 10000:
+            self._flush()
+
+    def _flush(self):
+        self.conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", self.rows)
+        self.rows = []
+
+    def close(self):
+        self._flush()
+        self.conn.executescript(INDEXES)
+        self.conn.commit()
+        self.conn.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        self.conn.close()
+        os.remove(self.tmp)
+
+
+class BillIndex:
+    """Read side: open once, answer any number of lookups."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.conn = sqlite3.connect(os.path.join(output_dir, INDEX_NAME))
+        self.files = dict(self.conn.execute("SELECT category, file FROM files"))
+        self.handles = {}
+
+    def _read(self, category, offset, length):
+        f = self.handles.get(category)
+        if f is None:
+            f = self.handles[category] = open(os.path.join(self.output_dir, self.files[category]), 'rb')
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+    def find(self, category, filters, limit=None):
+        """Records in `category` whose keys match every non-None filter (case-insensitive)."""
+        where = ["category = ?"]
+        args = [category]
+        for k in KEYS:
+            if filters.get(k) is not None:
+                where.append(f"{k} = ?")
+                args.append(filters[k])
+        sql = f"SELECT offset, length FROM records WHERE {' AND '.join(where)} ORDER BY rowid"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [self._read(category, off, ln) for off, ln in self.conn.execute(sql, args)]
+
+    def close(self):
+        for f in self.handles.values():
+            f.close()
+        self.conn.close()
+
+
+def open_index(output_dir):
+    """BillIndex for output_dir, or None if there is no index or a data file is newer than it."""
+    path = os.path.join(output_dir, INDEX_NAME)
+    if not os.path.exists(path):
+        return None
+    index = BillIndex(output_dir)
+    built = os.path.getmtime(path)
+    for fn in index.files.values():
+        fp = os.path.join(output_dir, fn)
+        if not os.path.exists(fp) or os.path.getmtime(fp) > built:
+            index.close()
+            return None
+    return index
+
+
+class MemoryIndex:
+    """
+    Same find() interface over fully loaded datasets, for when there is no
+    sqlite index: uuid and (state, session, state_bill_id) lookups are dicts,
+    any other filter combination scans.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.by_uuid = {}
+        self.by_bill = {}
+        for category, recs in data.items():
+            uuids, bills = {}, {}
+            for rec in recs:
+                keys = [str(rec.get(k, '')).lower() for k in KEYS]
+                uuids.setdefault(keys[0], []).append(rec)
+                bills.setdefault(tuple(keys[1:]), []).append(rec)
+            self.by_uuid[category] = uuids
+            self.by_bill[category] = bills
+
+    def find(self, category, filters, limit=None):
+        given = {k: str(filters[k]).lower() for k in KEYS if filters.get(k) is not None}
+        if 'uuid' in given:
+            candidates = self.by_uuid[category].get(given['uuid'], [])
+        elif len(given) == 3:
+            candidates = self.by_bill[category].get(
+                (given['state'], given['session'], given['state_bill_id']), [])
+        else:
+            candidates = self.data[category]
+        hits = [r for r in candidates
+                if all(str(r.get(k, '')).lower() == v for k, v in given.items())]
+        return hits[:limit] if limit else hits
+
+    def close(self):
+        pass
@@ -0,0 +1,152 @@
+import os
+import glob
+import json
+from bs4 import BeautifulSoup
+from tqdm import tqdm
+
+from fetch import fetch, prefetch, page_hash
+from checkpoint import run_checkpointed, source_hash
+from history import parse_history, adjust_prefix
+from votes import find_vote_links, fetch_vote_pages, assemble_votes, vote_key
+from sponsors import parse_sponsors, sponsor_source
+from metadata import load_all_statuses, find_version_links, metadata_record, session_pages
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fused bill-page stage: each bill detail page is fetched and parsed exactly
+# once, and that one tree feeds metadata (version links), sponsors (detail-page
+# fallback), history and votes (vote links).  Writes the same four
+# intermediate folders process_metadata / process_sponsors / process_history /
+# process_votes would, with the same file names and row order.
+# ──────────────────────────────────────────────────────────────────────────────
+
+# html.parser, as every other NV stage uses, so the output matches theirs.
+# NV_HTML_PARSER=lxml is several times faster on these pages, but lxml is not in
+# NV/requirements.txt and its tree can differ on badly nested markup (e.g. unclosed <li>).
+PARSER = os.environ.get("NV_HTML_PARSER", "html.parser")
+
+
+def make_soup(html):
+    return BeautifulSoup(html, PARSER)
+
+
+def parse_bill_page(row, status_map):
+    """
+    Everything the four downstream stages need from one detail page.  Votes
+    are left as the page's vote links (under "vote_links"); finish_bill_page
+    turns them into votes once the batch's vote pages are in.
+    """
+    link    = row.get("Link") or ""
+    session = row.get("session", "")
+    sbid    = row.get("state_bill_id", "")
+
+    page = fetch(link)
+    soup = make_soup(page.text)
+
+    # same outcome find_version_links has when it can't load the page itself
+    version_links = find_version_links(link, soup) if page.status_code < 400 else ("", "")
+
+    bill_history = parse_history(soup, session)
+    if bill_history is not None:
+        bill_history = adjust_prefix(bill_history, sbid)
+
+    return {
+        "metadata":      metadata_record(row, status_map, version_links),
+        "sponsors":      parse_sponsors(session, link, sbid, soup=soup),
+        "bill_history":  bill_history,
+        "vote_links":    find_vote_links(soup, link.strip()) if link.strip() else [],
+        "version_links": version_links,
+    }
+
+
+def finish_bill_page(parsed, row, vote_pages):
+    """
+    parse_bill_page's result with its vote links assembled into votes.  The
+    vote and version pages it read are kept under "pages" (see bill_page_deps).
+    """
+    parsed = dict(parsed)
+    vote_links = parsed.pop("vote_links")
+    parsed["votes"] = assemble_votes(vote_links, row.get("session", "").strip(), vote_pages)
+    html, pdf = parsed.pop("version_links")
+    # the PDF is the title source when there is no HTML version (as prefetch_pdf_acts assumes)
+    versions = [html] if html.lower().endswith((".htm", "html")) else [pdf]
+    parsed["pages"] = [u for u in versions if u] + [u for u, _, _ in vote_links]
+    return parsed
+
+
+def bill_page_source(row, session_hashes):
+    """
+    Detail page, the sponsor-file entries parse_bill_page reads and the
+    session's status and summary pages (hashed once per session in session_hashes).
+    """
+    link    = row.get("Link") or ""
+    session = row.get("session", "")
+    if session not in session_hashes:
+        session_hashes[session] = source_hash(*(page_hash(u) for u in session_pages(session)))
+    return source_hash(page_hash(link), sponsor_source(session, link, row.get("state_bill_id", "")),
+                       session_hashes[session])
+
+
+def bill_page_deps(parsed):
+    """Hashes of the vote and version pages a finished bill was built from."""
+    return [page_hash(u) for u in parsed.get("pages", [])]
+
+
+def process_bill_pages(input_dir, output_dir, resume=True):
+    """
+    output_dir is the intermediate root; results go to its metadata/,
+    sponsors/, history/ and votes/ subfolders.  Finished bills are
+    checkpointed under output_dir/_checkpoints/bill_pages/, so an interrupted
+    run picks up where it stopped; resume=False reparses everything.
+    """
+    dirs = {name: os.path.join(output_dir, name)
+            for name in ("metadata", "sponsors", "history", "votes")}
+    for d in dirs.values():
+        os.makedirs(d, exist_ok=True)
+
+    status_map = load_all_statuses()
+    for json_path in tqdm(glob.glob(os.path.join(input_dir, "bills_*.json")), desc="Processing bill pages"):
+        with open(json_path, encoding="utf8") as rf:
+            records = json.load(rf)
+        prefetch(row.get("Link") for row in records)
+
+        # Each pending detail page is parsed once, a slice of bills at a time; its
+        # vote links then decide which vote pages the slice fetches (each distinct one once).
+        parsed_pages, vote_pages = {}, {}
+        def prepare(pending):
+            vote_urls = {}
+            for row in pending:
+                parsed = parsed_pages[id(row)] = parse_bill_page(row, status_map)
+                session = row.get("session", "").strip()
+                for vote_url, _, _ in parsed["vote_links"]:
+                    vote_urls.setdefault(vote_key(session, vote_url), vote_url)
+            vote_pages.update(fetch_vote_pages(vote_urls))
+
+        session_hashes = {}
+        results = run_checkpointed("bill_pages", json_path, output_dir, records,
+                                   lambda row: finish_bill_page(parsed_pages.pop(id(row)), row, vote_pages),
+                                   source_of=lambda row: bill_page_source(row, session_hashes),
+                                   resume=resume, prepare=prepare, depends_on=bill_page_deps)
+
+        meta_rows, sponsor_rows, history_rows, vote_rows = [], [], [], []
+        for row, parsed in zip(records, results):
+            meta_rows.append(parsed["metadata"])
+            sponsor_rows.append({**row, "sponsors": parsed["sponsors"]})
+            if parsed["bill_history"] is not None:
+                history_rows.append({**row, "bill_history": parsed["bill_history"]})
+            vote_rows.append({**row, "votes": parsed["votes"]})
+
+        json_name = os.path.basename(json_path)
+        outputs = (
+            (dirs["metadata"], json_name.replace("bills_", "metadata_"), meta_rows),
+            (dirs["sponsors"], json_name, sponsor_rows),
+            (dirs["history"],  json_name, history_rows),
+            (dirs["votes"],    json_name, vote_rows),
+        )
+        for out_dir, fn, rows in outputs:
+            with open(os.path.join(out_dir, fn), "w", encoding="utf8") as wf:
+                json.dump(rows, wf, indent=2)
+        print(f"Wrote → {json_name} (metadata, sponsors, history, votes)")
+
+
+if __name__ == "__main__":
+    process_bill_pages(input_dir="NV/intermediate/basedata", output_dir="NV/intermediate")
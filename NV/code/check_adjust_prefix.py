@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Regression check for history.adjust_prefix against the original quadratic
+implementation.
+
+Runs both on every history parsed from the cached bill pages listed in
+basedata (NV_OFFLINE=1 keeps it off the network) and, with --fuzz N, on N
+random histories built from real action phrases.  Any difference is printed
+and the script exits non-zero.
+
+    python NV/code/check_adjust_prefix.py --basedata NV/intermediate/basedata --fuzz 20000
+"""
+import os
+import re
+import copy
+import glob
+import json
+import time
+import random
+import argparse
+from bs4 import BeautifulSoup
+
+import history
+from fetch import fetch
+
+
+def legacy_adjust_prefix(bill_history, bill_id):
+    # choose S or A if bill_id starts with that letter
+    bid = bill_id.upper()
+    if bid.startswith('S'):
+        base = 'S - '
+    elif bid.startswith('A'):
+        base = 'A - '
+    else:
+        return bill_history
+    # find the first "Introduced By" entry index
+    idxs = sorted(bill_history.keys())
+    first_intro = next((i for i in idxs
+                        if 'introduced by' in bill_history[i]['action'].lower()), None)
+    if first_intro is None:
+        return bill_history
+    end = first_intro + 1  # include the "Read first time" action right after
+    for i in idxs:
+        if i <= end:
+            # strip existing prefix like "P - ", "A - ", "S - "
+            act = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[i]['action'])
+            bill_history[i]['action'] = base + act
+    # infer chamber transitions based on “To Senate” / “To Assembly” markers
+    keys = sorted(bill_history.keys(), key=int)
+    governor_applied = False
+    for idx in keys:
+        action = bill_history[idx]['action']
+        raw = re.sub(r'^[A-Z]\s*-\s*', '', action)
+        low = raw.lower()
+
+        if not governor_applied and 'governor' in low:      # first gov transition
+            governor_applied = True
+            # find last explicit S/A prefix before this point
+            prior = [j for j in keys if j<idx and bill_history[j]['action'].startswith(('S - ','A - '))]
+            anchor = max(prior) if prior else None
+            # apply origin‐chamber prefix to entries up through this transition
+            if anchor:
+                orig = bill_history[anchor]['action'][0]
+                for k in keys:
+                    if anchor<k<=idx:
+                        txt = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[k]['action'])
+                        bill_history[k]['action'] = f"{orig} - {txt}"
+            # prefix all later entries G -
+            for k in keys:
+                if k>idx:
+                    txt = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[k]['action'])
+                    bill_history[k]['action'] = f"G - {txt}"
+            continue
+
+        if 'to senate' in low:
+            origin, dest = 'A', 'S'
+        elif 'to assembly' in low:
+            origin, dest = 'S', 'A'
+        else:
+            continue
+
+        # existing S/A transition logic...
+        prior_idxs = [j for j in keys if j<idx and bill_history[j]['action'].startswith(f"{origin} - ")]
+        anchor = max(prior_idxs) if prior_idxs else 0
+        for k in keys:
+            if anchor<k<=idx:
+                txt = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[k]['action'])
+                bill_history[k]['action'] = f"{origin} - {txt}"
+        # after transfer, subsequent entries default to dest until changed again
+
+    return bill_history
+
+
+def cached_histories(basedata_dir):
+    """(state_bill_id, raw parsed history) for every cached bill page."""
+    for jf in sorted(glob.glob(os.path.join(basedata_dir, "bills_*.json"))):
+        with open(jf, encoding="utf8") as f:
+            rows = json.load(f)
+        for row in rows:
+            try:
+                page = fetch(row["Link"])
+            except Exception:
+                continue
+            hist = history.parse_history(BeautifulSoup(page.text, "html.parser"), row.get("session", ""))
+            if hist:
+                yield row.get("state_bill_id", ""), hist
+
+
+PHRASES = [
+    "Introduced By: Smith", "Read first time. Referred to Committee on Elections.",
+    "Read third time. Passed.", "In Senate.", "In Assembly.", "To Senate.", "To Assembly.",
+    "Approved by the Governor.", "Enrolled and delivered to Governor.", "To printer.",
+    "From printer. To committee.", "Chapter 12.", "Do pass.", "  Filed with Secretary of State.",
+]
+PREFIXES = ["A - ", "S - ", "P - ", "G - ", "H - ", "", "A-", "S -  "]
+
+
+def random_history(rng):
+    n = rng.randint(0, 40)
+    return {i + 1: {"date": "", "action": rng.choice(PREFIXES) + rng.choice(PHRASES)} for i in range(n)}
+
+
+def compare(cases):
+    bad = 0
+    new_t = old_t = 0.0
+    for bill_id, hist in cases:
+        a, b = copy.deepcopy(hist), copy.deepcopy(hist)
+        t = time.perf_counter()
+        legacy_adjust_prefix(a, bill_id)
+        old_t += time.perf_counter() - t
+        t = time.perf_counter()
+        history.adjust_prefix(b, bill_id)
+        new_t += time.perf_counter() - t
+        if a != b:
+            bad += 1
+            if bad <= 5:
+                print(f"MISMATCH {bill_id}:\n  legacy {a}\n  new    {b}")
+    return bad, old_t, new_t
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--basedata", default="NV/intermediate/basedata")
+    p.add_argument("--fuzz", type=int, default=0, help="also check this many random histories")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    failed = 0
+    suites = [("cached", list(cached_histories(args.basedata)))]
+    if args.fuzz:
+        rng = random.Random(args.seed)
+        suites.append(("fuzz", [(rng.choice(["AB1", "SB1", "AJR1", "SJR1", "XX1"]), random_history(rng))
+                                for _ in range(args.fuzz)]))
+    for name, cases in suites:
+        bad, old_t, new_t = compare(cases)
+        failed += bad
+        entries = sum(len(h) for _, h in cases)
+        print(f"{name}: {len(cases)} histories, {entries} entries, {bad} mismatches "
+              f"(legacy {old_t:.3f}s, new {new_t:.3f}s)")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Per-bill checkpointing for the NV stages.
+#
+# Each (stage, bills_*.json) pair gets an append-only manifest under
+# <output_dir>/_checkpoints/<stage>/: one line per finished bill with its uuid,
+# a hash of the source it was built from (normally the cached detail page) and
+# the bill's result.  A line is flushed as soon as the bill is done, so after a
+# crash the stage resumes from the last completed bill, and on a re-run a bill
+# is only reprocessed when its source hash has changed.
+#
+# Stages that batch work up front (prepare) do it PREPARE_BATCH bills at a
+# time, checkpointing each slice before preparing the next, so a crash loses
+# at most one slice.
+# ──────────────────────────────────────────────────────────────────────────────
+
+_MISSING = object()
+
+PREPARE_BATCH = int(os.environ.get("NV_PREPARE_BATCH", 100))
+
+
+def source_hash(*parts):
+    """Stable hash of whatever a bill's result was derived from."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(str(p).encode("utf8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class Checkpoint:
+
+    def __init__(self, output_dir, stage, json_name, resume=True):
+        ckpt_dir = os.path.join(output_dir, "_checkpoints", stage)
+        os.makedirs(ckpt_dir, exist_ok=True)
+        self.path = os.path.join(ckpt_dir, os.path.splitext(json_name)[0] + ".jsonl")
+        self.done = {}
+        if resume and os.path.exists(self.path):
+            with open(self.path, encoding="utf8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    self.done[entry["uuid"]] = (entry["source"], entry["result"])
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self.f = open(self.path, "a", encoding="utf8")
+
+    def lookup(self, uuid, source, depends_on=None):
+        hit = self.done.get(uuid)
+        if hit is None:
+            return _MISSING
+        if depends_on is not None:
+            source = source_hash(source, *depends_on(hit[1]))
+        return hit[1] if hit[0] == source else _MISSING
+
+    def record(self, uuid, source, result):
+        self.f.write(json.dumps({"uuid": uuid, "source": source, "result": result}) + "\n")
+        self.f.flush()
+        self.done[uuid] = (source, result)
+
+    def close(self):
+        """Compact the manifest down to the latest entry per bill."""
+        self.f.close()
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf8") as f:
+            for uuid, (source, result) in self.done.items():
+                f.write(json.dumps({"uuid": uuid, "source": source, "result": result}) + "\n")
+        os.replace(tmp, self.path)
+
+
+def run_checkpointed(stage, json_path, output_dir, records, process_row, source_of,
+                     resume=True, prepare=None, depends_on=None):
+    """
+    process_row(row) for every record, in order, skipping bills whose
+    checkpointed source hash still matches source_of(row).  depends_on(result),
+    if given, lists hashes of further pages a result was built from (known only
+    once it is built); they are folded into its source hash.  If given,
+    prepare(rows) is called with each slice of up to PREPARE_BATCH rows about
+    to be processed, so a stage can batch work across them first.  Returns the
+    per-row results aligned with `records`.
+    """
+    ckpt = Checkpoint(output_dir, stage, os.path.basename(json_path), resume=resume)
+    try:
+        keys = [(row.get("uuid") or row.get("Link") or "", source_of(row)) for row in records]
+        results = [ckpt.lookup(uuid, source, depends_on) for uuid, source in keys]
+        pending = [i for i, result in enumerate(results) if result is _MISSING]
+        reused = len(records) - len(pending)
+        step = PREPARE_BATCH if prepare is not None else max(len(pending), 1)
+        for start in range(0, len(pending), step):
+            batch = pending[start:start + step]
+            if prepare is not None:
+                prepare([records[i] for i in batch])
+            for i in batch:
+                result = results[i] = process_row(records[i])
+                uuid, source = keys[i]
+                if depends_on is not None:
+                    source = source_hash(source, *depends_on(result))
+                ckpt.record(uuid, source, result)
+    finally:
+        ckpt.close()
+    if reused:
+        print(f"[{stage}] {os.path.basename(json_path)}: reused {reused}/{len(records)} checkpointed bills")
+    return results
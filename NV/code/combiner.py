@@ -1,60 +1,147 @@
 #!/usr/bin/env python3
 import os
 import glob
+import gzip
 import json
 import argparse
 from tqdm import tqdm
 
-def combine_folder(folder_path, recursive=False):
+from bill_index import IndexBuilder, INDEX_NAME
+
+# (intermediate sub-folder, output base name, what the print-out calls it)
+CATEGORIES = [
+    ('metadata', 'bill_metadata', 'metadata'),
+    ('sponsors', 'sponsors',      'sponsor'),
+    ('history',  'bill_history',  'history'),
+    ('votes',    'votes',         'vote'),
+]
+
+def iter_folder(folder_path, recursive=False):
     """
-    Load & concatenate all JSON arrays in folder_path/*.json
+    Yield the records of every JSON array in folder_path/*.json, one file at
+    a time, so only a single input file is ever held in memory.
     If recursive=True, globs **/*.json instead.
     """
     pattern = '**/*.json' if recursive else '*.json'
     files = glob.glob(os.path.join(folder_path, pattern), recursive=recursive)
-    combined = []
     for fp in tqdm(files, desc=f"Combining {os.path.basename(folder_path)}"):
         try:
             with open(fp, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            if isinstance(data, list):
-                combined.extend(data)
-            else:
-                combined.append(data)
         except Exception as e:
             print(f"⚠️  Skipping {fp}: {e}")
-    return combined
+            continue
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
 
-def process_combiner(input_dir=None, output_dir=None):
+def combine_folder(folder_path, recursive=False):
+    """
+    Load & concatenate all JSON arrays in folder_path/*.json
+    If recursive=True, globs **/*.json instead.
+    """
+    return list(iter_folder(folder_path, recursive=recursive))
+
+# ──────────────────────────────────────────────────────────────────────────────
+# incremental writers
+# ──────────────────────────────────────────────────────────────────────────────
+
+class JsonArrayWriter:
+    """
+    Writes records one at a time as a pretty JSON array, byte-for-byte the
+    same as json.dump(records, f, indent=2).  write() returns the byte
+    offset and length of the record it just wrote.
+    """
+
+    def __init__(self, path, compress=False):
+        self.f = gzip.open(path, 'wb') if compress else open(path, 'wb')
+        self.pos = 0
+        self.count = 0
+
+    def _emit(self, text):
+        data = text.encode('utf-8')
+        self.f.write(data)
+        self.pos += len(data)
+
+    def write(self, rec):
+        self._emit('[\n  ' if self.count == 0 else ',\n  ')
+        body = json.dumps(rec, indent=2).replace('\n', '\n  ').encode('utf-8')
+        offset = self.pos
+        self.f.write(body)
+        self.pos += len(body)
+        self.count += 1
+        return offset, len(body)
+
+    def close(self):
+        self._emit('\n]' if self.count else '[]')
+        self.f.close()
+
+class JsonLinesWriter(JsonArrayWriter):
+    """One compact JSON object per line."""
+
+    def write(self, rec):
+        body = json.dumps(rec, separators=(',', ':')).encode('utf-8')
+        offset = self.pos
+        self.f.write(body + b'\n')
+        self.pos += len(body) + 1
+        self.count += 1
+        return offset, len(body)
+
+    def close(self):
+        self.f.close()
+
+WRITERS = {
+    'json':  ('.json',  JsonArrayWriter),
+    'jsonl': ('.jsonl', JsonLinesWriter),
+}
+
+def process_combiner(input_dir=None, output_dir=None, fmt='json', compress=False):
+    """
+    Stream every intermediate category into output_dir.
+    fmt='json' writes the legacy pretty arrays (bill_metadata.json, …),
+    fmt='jsonl' writes JSON Lines (bill_metadata.jsonl, …);
+    compress=True gzips either one (….json.gz / ….jsonl.gz).
+    Uncompressed outputs also get a bill_index.sqlite sidecar for query.py.
+    """
     os.makedirs(output_dir, exist_ok=True)
+    ext, writer_cls = WRITERS[fmt]
+    if compress:
+        ext += '.gz'
+
+    index_path = os.path.join(output_dir, INDEX_NAME)
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    index = None if compress else IndexBuilder(output_dir)
 
-    # 1) metadata (non-recursive)
-    md_in = os.path.join(input_dir, 'metadata')
-    md_all = combine_folder(md_in, recursive=False)
-    with open(os.path.join(output_dir, 'bill_metadata.json'), 'w', encoding='utf-8') as f:
-        json.dump(md_all, f, indent=2)
-    print(f"Wrote {len(md_all)} metadata records → bill_metadata.json")
-
-    # 2) sponsors (non-recursive)
-    sp_in = os.path.join(input_dir, 'sponsors')
-    sp_all = combine_folder(sp_in, recursive=False)
-    with open(os.path.join(output_dir, 'sponsors.json'), 'w', encoding='utf-8') as f:
-        json.dump(sp_all, f, indent=2)
-    print(f"Wrote {len(sp_all)} sponsor records → sponsors.json")
-
-    # 3) history (non-recursive)
-    hist_in = os.path.join(input_dir, 'history')
-    hist_all = combine_folder(hist_in, recursive=False)
-    with open(os.path.join(output_dir, 'bill_history.json'), 'w', encoding='utf-8') as f:
-        json.dump(hist_all, f, indent=2)
-    print(f"Wrote {len(hist_all)} history records → bill_history.json")
-
-    # 4) votes (non-recursive)
-    votes_in = os.path.join(input_dir, 'votes')
-    votes_all = combine_folder(votes_in, recursive=False)
-    with open(os.path.join(output_dir, 'votes.json'), 'w', encoding='utf-8') as f:
-        json.dump(votes_all, f, indent=2)
-    print(f"Wrote {len(votes_all)} vote records → votes.json")
+    try:
+        for folder, base, label in CATEGORIES:
+            fn = base + ext
+            writer = writer_cls(os.path.join(output_dir, fn), compress=compress)
+            if index:
+                index.add_file(folder, fn)
+            try:
+                for rec in iter_folder(os.path.join(input_dir, folder), recursive=False):
+                    offset, length = writer.write(rec)
+                    if index:
+                        index.add(folder, rec, offset, length)
+            finally:
+                writer.close()
+            print(f"Wrote {writer.count} {label} records → {fn}")
+    except BaseException:
+        if index:
+            index.abort()
+        raise
+    if index:
+        index.close()
+        print(f"Wrote index → {INDEX_NAME}")
 
 if __name__ == '__main__':
-    process_combiner(input_dir='intermediate', output_dir='output')
+    p = argparse.ArgumentParser(description="Combine the NV intermediate JSONs into the final outputs")
+    p.add_argument("--input_dir", default="intermediate")
+    p.add_argument("--output_dir", default="output")
+    p.add_argument("--format", choices=sorted(WRITERS), default="json")
+    p.add_argument("--gzip", action="store_true")
+    args = p.parse_args()
+    process_combiner(input_dir=args.input_dir, output_dir=args.output_dir,
+                     fmt=args.format, compress=args.gzip)
@@ -0,0 +1,70 @@
+import re
+from datetime import date
+from functools import lru_cache
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Date normalizer shared by history.py and votes.py.
+#
+# The NV pages use six date layouts.  They used to be tried one strptime()
+# call at a time, paying for an exception on every miss; here a single
+# compiled regex with one named branch per layout picks the format in one
+# match.  It accepts exactly what the strptime loop accepted:
+#
+#   "%m/%d/%y"     04/03/97
+#   "%b %d, %Y"    Apr  3, 1997
+#   "%B %d, %Y"    April 3, 1997
+#   "%b-%d-%Y"     Apr-21-1999
+#   "%b.%d,%Y"     Apr.01,1999
+#   "%b. %d, %Y"   Mar. 27, 2007
+#
+# (strptime turns a space in the format into \s+ and lets %d/%m drop the
+# leading zero, or pad %d with a space.)  Anything else comes back unchanged.
+# ──────────────────────────────────────────────────────────────────────────────
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+MONTH_NUM = {}
+for _i, _name in enumerate(MONTHS, 1):
+    MONTH_NUM[_name] = MONTH_NUM[_name[:3]] = _i
+
+_ABBR = "|".join(m[:3] for m in MONTHS)
+_NAME = "|".join(MONTHS) + "|" + _ABBR
+_DAY  = r"3[01]|[12]\d|0[1-9]|[1-9]| [1-9]"
+_MON  = r"1[0-2]|0[1-9]|[1-9]"
+
+DATE_RE = re.compile(
+    rf"(?P<m1>{_MON})/(?P<d1>{_DAY})/(?P<y1>\d\d)"               # %m/%d/%y
+    rf"|(?P<n2>{_NAME})\s+(?P<d2>{_DAY}),\s+(?P<y2>\d\d\d\d)"    # %b %d, %Y  /  %B %d, %Y
+    rf"|(?P<n3>{_ABBR})-(?P<d3>{_DAY})-(?P<y3>\d\d\d\d)"         # %b-%d-%Y
+    rf"|(?P<n4>{_ABBR})\.(?P<d4>{_DAY}),(?P<y4>\d\d\d\d)"        # %b.%d,%Y
+    rf"|(?P<n5>{_ABBR})\.\s+(?P<d5>{_DAY}),\s+(?P<y5>\d\d\d\d)", # %b. %d, %Y
+    re.IGNORECASE,
+)
+
+
+def _ymd(m):
+    if m["m1"]:
+        yy = int(m["y1"])
+        # strptime's %y pivot: 69-99 → 19xx, 00-68 → 20xx
+        return (1900 + yy if yy >= 69 else 2000 + yy), int(m["m1"]), int(m["d1"])
+    for i in "2345":
+        if m["n" + i]:
+            return int(m["y" + i]), MONTH_NUM[m["n" + i].lower()], int(m["d" + i])
+
+
+@lru_cache(maxsize=65536)
+def _normalize(txt):
+    m = DATE_RE.fullmatch(txt)
+    if not m:
+        return txt
+    y, mo, d = _ymd(m)
+    try:
+        date(y, mo, d)
+    except ValueError:  # e.g. Feb 30
+        return txt
+    return f"{y}-{mo:02d}-{d:02d}"  # strftime("%Y-%m-%d"), which doesn't pad years < 1000
+
+
+def parse_date(txt):
+    """'Apr  3, 1997' / '04/03/97' / … → '1997-04-03'; unrecognized text is returned stripped."""
+    return _normalize(txt.strip())
@@ -0,0 +1,443 @@
+import os
+import sys
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.http_client import HttpClient, HostMetrics, HTTPError, encoding_for
+from common.http_archive import MODE as HTTP_MODE
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Shared fetch layer + on-disk response cache for every NV stage.
+#
+# Layout under CACHE_DIR:
+#   keys/<kk>/<key>.json     one entry per (method, url, request body)
+#   bodies/<hh>/<sha>.z      zlib-compressed response bodies, by content hash
+#   pdf_text/<hh>/<sha>.json text extracted from the PDF body <sha> (metadata.py)
+#
+# Entries younger than CACHE_TTL are served straight from disk.  Older ones are
+# revalidated with If-None-Match / If-Modified-Since when the server gave us an
+# ETag / Last-Modified, and are served stale if the site can't be reached, so a
+# re-run works offline.  Set NV_OFFLINE=1 to never touch the network.
+# With SCRAPER_HTTP_MODE=record the cache is bypassed so every page goes
+# through (and into) the shared client's record/replay archive.
+# ──────────────────────────────────────────────────────────────────────────────
+
+CACHE_DIR       = os.environ.get("NV_CACHE_DIR", "NV/intermediate/cache")
+CACHE_TTL       = float(os.environ.get("NV_CACHE_TTL", 7 * 24 * 3600))       # revalidate after
+CACHE_MAX_AGE   = float(os.environ.get("NV_CACHE_MAX_AGE", 180 * 24 * 3600)) # evict if unused this long
+CACHE_MAX_BYTES = int(os.environ.get("NV_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+OFFLINE         = os.environ.get("NV_OFFLINE", "") == "1"
+PDF_TEXT_DIR    = os.path.join(CACHE_DIR, "pdf_text")
+TIMEOUT         = 60
+
+# network side (common/http_client.py): per-host concurrency cap, token bucket, retries
+MAX_PER_HOST    = int(os.environ.get("NV_MAX_PER_HOST", 8))
+RATE_PER_HOST   = float(os.environ.get("NV_RATE_PER_HOST", 10))  # requests / second
+MAX_RETRIES     = 4
+BACKOFF_BASE    = 1.0
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+_client = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "revalidated": 0, "stale": 0, "evicted": 0}
+_worker_metrics = HostMetrics()  # requests made by stage worker processes, see merge_worker_stats
+
+
+class CachedResponse:
+    """The small slice of requests.Response the NV stages actually use."""
+
+    def __init__(self, url, status_code, content, encoding, headers, sha256, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self._encoding = encoding
+        self.headers = headers
+        self.sha256 = sha256
+        self.from_cache = from_cache
+
+    @property
+    def encoding(self):
+        # worked out on first use: most cached bodies (PDFs) are never decoded
+        if self._encoding is None:
+            ctype = self.headers.get("Content-Type") or self.headers.get("content-type")
+            self._encoding = encoding_for({"content-type": ctype}, self.content)
+        return self._encoding
+
+    @encoding.setter
+    def encoding(self, value):
+        self._encoding = value
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# cache helpers
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _count(name, n=1):
+    with _lock:
+        _stats[name] += n
+
+
+def cache_key(url, data=None, method="GET"):
+    """Key on method, URL and (canonicalised) request body."""
+    if isinstance(data, dict):
+        body = urlencode(sorted(data.items()))
+    else:
+        body = data or ""
+    if isinstance(body, str):
+        body = body.encode("utf8")
+    h = hashlib.sha256()
+    h.update(method.upper().encode("ascii") + b"\0" + url.encode("utf8") + b"\0" + body)
+    return h.hexdigest()
+
+
+def _key_path(key):
+    return os.path.join(CACHE_DIR, "keys", key[:2], key + ".json")
+
+
+def _body_path(sha):
+    return os.path.join(CACHE_DIR, "bodies", sha[:2], sha + ".z")
+
+
+def _atomic_write(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def _read_entry(key):
+    path = _key_path(key)
+    try:
+        with open(path, encoding="utf8") as f:
+            meta = json.load(f)
+        with open(_body_path(meta["sha256"]), "rb") as f:
+            content = zlib.decompress(f.read())
+    except (OSError, ValueError, KeyError, zlib.error):
+        return None
+    return meta, content
+
+
+def _write_entry(key, url, method, status, headers, content):
+    sha = hashlib.sha256(content).hexdigest()
+    body_path = _body_path(sha)
+    if not os.path.exists(body_path):
+        _atomic_write(body_path, zlib.compress(content, 6))
+    meta = {
+        "url":           url,
+        "method":        method,
+        "status":        status,
+        "etag":          headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "content_type":  headers.get("Content-Type"),
+        "sha256":        sha,
+        "size":          len(content),
+        "fetched_at":    time.time(),
+    }
+    _atomic_write(_key_path(key), json.dumps(meta).encode("utf8"))
+    return meta
+
+
+def _touch(key, meta):
+    """Refresh fetched_at after a 304 so the entry is fresh for this run again."""
+    meta["fetched_at"] = time.time()
+    _atomic_write(_key_path(key), json.dumps(meta).encode("utf8"))
+
+
+def _from_meta(meta, content, from_cache=True):
+    headers = {}
+    if meta.get("etag"):
+        headers["ETag"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["Last-Modified"] = meta["last_modified"]
+    if meta.get("content_type"):
+        headers["Content-Type"] = meta["content_type"]
+    return CachedResponse(meta["url"], meta["status"], content, meta.get("encoding"),
+                          headers, meta["sha256"], from_cache)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# public API
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _lookup(url, data, method):
+    """Return (key, cached, fresh_response_or_None)."""
+    key = cache_key(url, data, method)
+    if HTTP_MODE == "record":
+        return key, None, None
+    cached = _read_entry(key)
+    if cached:
+        meta, content = cached
+        if OFFLINE or time.time() - meta["fetched_at"] < CACHE_TTL:
+            _count("hits")
+            os.utime(_key_path(key))
+            return key, cached, _from_meta(meta, content)
+    if OFFLINE:
+        raise httpx.ConnectError(f"NV_OFFLINE=1 and no cached response for {url}")
+    return key, cached, None
+
+
+def _request_headers(headers, cached):
+    req_headers = dict(HEADERS)
+    req_headers.update(headers or {})
+    if cached:
+        if cached[0].get("etag"):
+            req_headers["If-None-Match"] = cached[0]["etag"]
+        if cached[0].get("last_modified"):
+            req_headers["If-Modified-Since"] = cached[0]["last_modified"]
+    return req_headers
+
+
+def _store(key, cached, url, method, status, headers, content):
+    """Turn a live response into a CachedResponse, caching 2xx bodies."""
+    if cached and status == 304:
+        _count("revalidated")
+        _touch(key, cached[0])
+        return _from_meta(*cached)
+    _count("misses")
+    if 200 <= status < 300:
+        meta = _write_entry(key, url, method, status, headers, content)
+        return _from_meta(meta, content, from_cache=False)
+    return CachedResponse(url, status, content, None, dict(headers), hashlib.sha256(content).hexdigest(), False)
+
+
+def fetch(url, data=None, headers=None, method=None):
+    """
+    GET (or POST when `data` is given) through the on-disk cache.
+    Only 2xx responses are cached; anything else is returned uncached so the
+    caller can raise_for_status() exactly as it did with requests.
+    """
+    method = (method or ("POST" if data is not None else "GET")).upper()
+    key, cached, hit = _lookup(url, data, method)
+    if hit:
+        return hit
+
+    try:
+        resp = _http().request(method, url, data=data, headers=_request_headers(headers, cached))
+    except HTTPError:
+        if cached:
+            _count("stale")
+            return _from_meta(*cached)
+        raise
+    return _store(key, cached, url, method, resp.status_code, resp.headers, resp.content)
+
+
+def _http():
+    """The shared pooled client, created on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = HttpClient(max_per_host=MAX_PER_HOST, rate_per_host=RATE_PER_HOST,
+                                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, timeout=TIMEOUT)
+        return _client
+
+
+def _reset_after_fork():
+    # worker processes (vote / PDF / index pools) get their own client and loop thread
+    global _client, _lock
+    _client, _lock = None, threading.Lock()
+    # and count only their own work (take_worker_stats hands it back to the parent)
+    for name in _stats:
+        _stats[name] = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def print_http_metrics():
+    """Per-host request counts, retries, errors and latency of this run, worker processes included."""
+    m = HostMetrics()
+    if _client is not None:
+        m.merge(_client.metrics.take())
+    m.merge(_worker_metrics.take())
+    m.print()
+
+
+def take_worker_stats():
+    """
+    Cache counters and request metrics of this process since the last call,
+    reset to zero.  A stage running in a worker process returns this to the
+    parent, which adds it in with merge_worker_stats.
+    """
+    with _lock:
+        stats = dict(_stats)
+        for name in _stats:
+            _stats[name] = 0
+    return {"cache": stats, "http": _client.metrics.take() if _client is not None else {}}
+
+
+def merge_worker_stats(report):
+    with _lock:
+        for name, n in report["cache"].items():
+            _stats[name] += n
+    _worker_metrics.merge(report["http"])
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Batch engine: concurrent fetches that land in the same cache
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _as_request(item):
+    """Accept a bare URL, (url, data) or (url, data, headers)."""
+    if isinstance(item, str):
+        return item, None, None
+    url, data, *rest = item
+    return url, data, (rest[0] if rest else None)
+
+
+async def _fetch_async(aclient, url, data, headers):
+    method = "POST" if data is not None else "GET"
+    key, cached, hit = _lookup(url, data, method)
+    if hit:
+        return hit
+
+    try:
+        resp = await aclient.request(method, url, data=data, headers=_request_headers(headers, cached))
+    except HTTPError:
+        if cached:
+            _count("stale")
+            return _from_meta(*cached)
+        raise
+
+    return await asyncio.to_thread(_store, key, cached, url, method,
+                                   resp.status_code, resp.headers, resp.content)
+
+
+async def _fetch_all(aclient, items, return_exceptions):
+    reqs = [_as_request(it) for it in items]
+    # the same page often appears more than once in a batch: fetch it once
+    unique = {}
+    for url, data, headers in reqs:
+        unique.setdefault(cache_key(url, data, "POST" if data is not None else "GET"),
+                          (url, data, headers))
+    results = await asyncio.gather(
+        *(_fetch_async(aclient, url, data, headers) for url, data, headers in unique.values()),
+        return_exceptions=return_exceptions,
+    )
+    by_key = dict(zip(unique, results))
+    return [by_key[cache_key(url, data, "POST" if data is not None else "GET")]
+            for url, data, _ in reqs]
+
+
+def fetch_many(items, return_exceptions=False):
+    """
+    Fetch a batch concurrently and return the responses in input order.
+    `items` are URLs, (url, data) or (url, data, headers) tuples; data → POST.
+    Batches from different threads share the client's per-host caps.
+    """
+    items = list(items)
+    if not items:
+        return []
+    client = _http()
+    return client.run(_fetch_all(client.aclient, items, return_exceptions))
+
+
+def prefetch(items):
+    """Warm the cache for a batch; failures surface later from fetch()."""
+    fetch_many([it for it in items if it], return_exceptions=True)
+
+
+def cache_stats():
+    with _lock:
+        return dict(_stats)
+
+
+def print_cache_stats():
+    s = cache_stats()
+    total = s["hits"] + s["misses"] + s["revalidated"] + s["stale"]
+    rate = (s["hits"] + s["revalidated"] + s["stale"]) / total if total else 0.0
+    print(f"HTTP cache: {s['hits']} hits, {s['misses']} misses, "
+          f"{s['revalidated']} revalidated, {s['stale']} served stale, "
+          f"{s['evicted']} evicted ({rate:.0%} served from cache)")
+
+
+def prune_cache(max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE):
+    """
+    Drop entries unused for longer than `max_age`, then the least recently
+    used ones until the compressed bodies and the PDF text derived from them
+    fit in `max_bytes`.  Bodies that no entry points at any more are removed
+    last, along with their PDF text; PDF text unused for `max_age` goes too.
+    """
+    keys_dir = os.path.join(CACHE_DIR, "keys")
+    bodies_dir = os.path.join(CACHE_DIR, "bodies")
+    if not os.path.isdir(keys_dir):
+        return
+
+    entries = []
+    for root, _, files in os.walk(keys_dir):
+        for fn in files:
+            if not fn.endswith(".json"):
+                continue
+            path = os.path.join(root, fn)
+            try:
+                with open(path, encoding="utf8") as f:
+                    sha = json.load(f)["sha256"]
+                entries.append((os.path.getmtime(path), path, sha))
+            except (OSError, ValueError, KeyError):
+                os.remove(path)
+    entries.sort()
+
+    body_sizes = {}
+    for root, _, files in os.walk(bodies_dir):
+        for fn in files:
+            if fn.endswith(".z"):
+                body_sizes[fn[:-2]] = os.path.getsize(os.path.join(root, fn))
+
+    # sha → (path, size, last used) of its extracted PDF text
+    pdf_texts = {}
+    for root, _, files in os.walk(PDF_TEXT_DIR):
+        for fn in files:
+            if fn.endswith(".json"):
+                path = os.path.join(root, fn)
+                pdf_texts[fn[:-5]] = (path, os.path.getsize(path), os.path.getmtime(path))
+
+    def size_of(sha):
+        return body_sizes.get(sha, 0) + (pdf_texts[sha][1] if sha in pdf_texts else 0)
+
+    now = time.time()
+    refs = {}
+    for _, _, sha in entries:
+        refs[sha] = refs.get(sha, 0) + 1
+    total = sum(size_of(sha) for sha in refs)
+
+    evicted = 0
+    for used_at, path, sha in entries:
+        if now - used_at <= max_age and total <= max_bytes:
+            break
+        os.remove(path)
+        evicted += 1
+        refs[sha] -= 1
+        if refs[sha] == 0:
+            total -= size_of(sha)
+
+    for sha, size in body_sizes.items():
+        if refs.get(sha, 0) == 0:
+            os.remove(_body_path(sha))
+    for sha, (path, _, used_at) in pdf_texts.items():
+        if refs.get(sha, 0) == 0 or now - used_at > max_age:
+            os.remove(path)
+            evicted += 1
+    _count("evicted", evicted)
+
+
+def page_hash(url):
+    """Content hash of a page as the cache currently has it ('' for no URL)."""
+    return fetch(url).sha256 if url else ""
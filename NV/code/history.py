@@ -1,20 +1,10 @@
-import os, glob, csv, json, re, requests
-from datetime import datetime
+import os, glob, csv, json, re
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
-# ---------------------------------------------------
-# replace your DATE_PATTERNS entirely with this:
-
-DATE_FORMATS = [
-    "%m/%d/%y",   # 04/03/97
-    "%b %d, %Y",  # Apr  3, 1997
-    "%B %d, %Y",  # April 3, 1997
-    "%b-%d-%Y",   # Apr-21-1999
-    "%b.%d,%Y",   # Apr.01,1999
-    "%b. %d, %Y",   # <— new for "Mar. 27, 2007"
-]
-# ---------------------------------------------------
+from fetch import fetch, prefetch, page_hash
+from checkpoint import run_checkpointed
+from dates import parse_date
 
 # — detect any of your possible raw date strings for the <li> backwards scan —
 DATE_DETECTOR = re.compile(
@@ -25,17 +15,6 @@ DATE_DETECTOR = re.compile(
 )
 
 
-def parse_date(txt):
-    txt = txt.strip()
-    for fmt in DATE_FORMATS:
-        try:
-            return datetime.strptime(txt, fmt).strftime("%Y-%m-%d")
-        except ValueError:
-            pass
-    # fallback: return raw so you can catch any truly unexpected format
-    return txt
-
-
 def prefix_for(action_text):
     low = action_text.lower()
     if "assembly" in low:
@@ -567,99 +546,155 @@ def parse_history_74th(soup):
     entries.sort(key=lambda ev: ev["date"])
     return {i+1: ev for i, ev in enumerate(entries)}
 
+PREFIX_RE  = re.compile(r'^[A-Z]\s*-\s*')
+LEADING_WS = re.compile(r'^\s+')
+
 def adjust_prefix(bill_history, bill_id):
+    """
+    Rewrite the A/S/G chamber prefixes in one pass over the history:
+      - the entries up to the first "Introduced By" (+ the read-first-time
+        right after it) get the bill's own chamber;
+      - a "To Senate" / "To Assembly" action relabels everything back to the
+        last entry already marked with its origin chamber;
+      - the first governor action relabels back to the last A/S entry with
+        that entry's chamber, and everything after it G.
+    Runs of equal prefixes are kept on a stack, so finding the anchor and
+    relabelling back to it is amortized O(1) per entry.  Keys are the 1-based
+    entry numbers the parsers produce.
+    """
     # choose S or A if bill_id starts with that letter
     bid = bill_id.upper()
     if bid.startswith('S'):
-        base = 'S - '
+        base = 'S'
     elif bid.startswith('A'):
-        base = 'A - '
+        base = 'A'
     else:
         return bill_history
-    # find the first "Introduced By" entry index
-    idxs = sorted(bill_history.keys())
-    first_intro = next((i for i in idxs
-                        if 'introduced by' in bill_history[i]['action'].lower()), None)
+    keys = sorted(bill_history.keys(), key=int)
+    actions = [bill_history[k]['action'] for k in keys]
+    # find the first "Introduced By" entry
+    first_intro = next((k for k, act in zip(keys, actions) if 'introduced by' in act.lower()), None)
     if first_intro is None:
         return bill_history
-    end = first_intro + 1  # include the "Read first time" action right after
-    for i in idxs:
-        if i <= end:
-            # strip existing prefix like "P - ", "A - ", "S - "
-            act = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[i]['action'])
-            bill_history[i]['action'] = base + act
-    # infer chamber transitions based on “To Senate” / “To Assembly” markers
-    keys = sorted(bill_history.keys(), key=int)
-    governor_applied = False
-    for idx in keys:
-        action = bill_history[idx]['action']
-        raw = re.sub(r'^[A-Z]\s*-\s*', '', action)
-        low = raw.lower()
-
-        if not governor_applied and 'governor' in low:      # first gov transition
-            governor_applied = True
-            # find last explicit S/A prefix before this point
-            prior = [j for j in keys if j<idx and bill_history[j]['action'].startswith(('S - ','A - '))]
-            anchor = max(prior) if prior else None
-            # apply origin‐chamber prefix to entries up through this transition
-            if anchor:
-                orig = bill_history[anchor]['action'][0]
-                for k in keys:
-                    if anchor<k<=idx:
-                        txt = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[k]['action'])
-                        bill_history[k]['action'] = f"{orig} - {txt}"
+
+    n = len(keys)
+    stripped = [PREFIX_RE.sub('', act) for act in actions]
+    lows     = [txt.lower() for txt in stripped]
+    # current prefix of each entry, as far as the "X - " anchors are concerned
+    tags = [act[0] if act.startswith(('S - ', 'A - ')) else None for act in actions]
+    # how many times each entry gets relabelled, as a difference array
+    relabels = [0] * (n + 1)
+
+    def relabel(lo, hi):
+        relabels[lo] += 1
+        relabels[hi + 1] -= 1
+
+    # include the "Read first time" action right after the introduction
+    head = sum(1 for k in keys if k <= first_intro + 1)
+    for p in range(head):
+        tags[p] = base
+    relabel(0, head - 1)
+
+    runs = []  # [start position, tag] for the entries handled so far
+    def push(start, tag):
+        if runs and runs[-1][1] == tag:
+            return
+        runs.append([start, tag])
+
+    def last_tagged(p, wanted):
+        """Position of the last entry before p whose tag is in `wanted`, or None."""
+        for r in range(len(runs) - 1, -1, -1):
+            if runs[r][1] in wanted:
+                return runs[r + 1][0] - 1 if r + 1 < len(runs) else p - 1
+        return None
+
+    def assign(lo, p, tag):
+        """Relabel positions lo..p (p = the current entry) with tag."""
+        while runs and runs[-1][0] >= lo:
+            runs.pop()
+        push(lo, tag)
+        relabel(lo, p)
+
+    # infer chamber transitions based on "To Senate" / "To Assembly" markers
+    governor_at = None
+    for p in range(n):
+        tag = 'G' if governor_at is not None else tags[p]
+        low = lows[p]
+
+        if governor_at is None and 'governor' in low:      # first gov transition
+            governor_at = p
+            # last explicit S/A prefix before this point
+            anchor = last_tagged(p, ('S', 'A'))
+            if anchor is not None:
+                orig = next(t for start, t in reversed(runs) if start <= anchor)
+                # apply origin-chamber prefix to entries up through this transition
+                assign(anchor + 1, p, orig)
+            else:
+                push(p, tag)
             # prefix all later entries G -
-            for k in keys:
-                if k>idx:
-                    txt = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[k]['action'])
-                    bill_history[k]['action'] = f"G - {txt}"
+            if p + 1 < n:
+                relabel(p + 1, n - 1)
             continue
 
         if 'to senate' in low:
-            origin, dest = 'A', 'S'
+            origin = 'A'
         elif 'to assembly' in low:
-            origin, dest = 'S', 'A'
+            origin = 'S'
         else:
+            push(p, tag)
             continue
 
-        # existing S/A transition logic...
-        prior_idxs = [j for j in keys if j<idx and bill_history[j]['action'].startswith(f"{origin} - ")]
-        anchor = max(prior_idxs) if prior_idxs else 0
-        for k in keys:
-            if anchor<k<=idx:
-                txt = re.sub(r'^[A-Z]\s*-\s*', '', bill_history[k]['action'])
-                bill_history[k]['action'] = f"{origin} - {txt}"
+        anchor = last_tagged(p, (origin,))
+        # no earlier origin-chamber entry: relabel from the start
+        assign(anchor + 1 if anchor is not None else 0, p, origin)
         # after transfer, subsequent entries default to dest until changed again
 
+    # write back: final prefix from the runs, text stripped once per relabel
+    count = 0
+    for r, (start, tag) in enumerate(runs):
+        stop = runs[r + 1][0] if r + 1 < len(runs) else n
+        for p in range(start, stop):
+            count += relabels[p]
+            if count:
+                txt = stripped[p] if count == 1 else LEADING_WS.sub('', stripped[p])
+                bill_history[keys[p]]['action'] = f"{tag} - {txt}"
     return bill_history
 
-def process_history(input_dir, output_dir):
+def parse_history(soup, session):
+    """Dispatch to the session's history parser; None for unknown sessions."""
+    if session == "69th1997":
+        return parse_history_69th(soup)
+    elif session in ("70th1999", "71st2001"):
+        return parse_history_70_71th(soup)
+    elif session == "72nd2003":
+        return parse_history_72nd(soup)
+    elif session == "73rd2005":
+        return parse_history_73rd(soup)
+    elif session == "74th2007":
+        return parse_history_74th(soup)
+    return None
+
+def history_for_row(row):
+    link     = row["Link"]
+    session  = row["session"]
+    r = fetch(link)
+    soup = BeautifulSoup(r.text, "html.parser")
+    bill_history = parse_history(soup, session)
+    if bill_history is None:
+        return None
+    # adjust initial prefixes based on state_bill_id
+    return adjust_prefix(bill_history, row.get('state_bill_id', ''))
+
+def process_history(input_dir, output_dir, resume=True):
     os.makedirs(output_dir, exist_ok=True)
     for json_path in tqdm(glob.glob(os.path.join(input_dir, "bills_*.json")), desc="Processing history"):
-        out_rows = []
         with open(json_path, 'r', encoding='utf8') as rf:
             records = json.load(rf)
-            for row in records:
-                link     = row["Link"]
-                session  = row["session"]
-                r = requests.get(link)
-                soup = BeautifulSoup(r.text, "html.parser")
-                if session == "69th1997":
-                    bill_history = parse_history_69th(soup)
-                elif session in ("70th1999", "71st2001"):
-                    bill_history = parse_history_70_71th(soup)
-                elif session == "72nd2003":
-                    bill_history = parse_history_72nd(soup)
-                elif session == "73rd2005":
-                    bill_history = parse_history_73rd(soup)
-                elif session == "74th2007":
-                    bill_history = parse_history_74th(soup)
-                else:
-                    # unknown session: skip this record
-                    continue
-                # adjust initial prefixes based on state_bill_id
-                bill_history = adjust_prefix(bill_history, row.get('state_bill_id', ''))
-                out_rows.append({**row, "bill_history": bill_history})
+        prefetch(row["Link"] for row in records)
+        histories = run_checkpointed("history", json_path, output_dir, records, history_for_row,
+                                     source_of=lambda row: page_hash(row["Link"]), resume=resume)
+        # unknown session (None): skip this record
+        out_rows = [{**row, "bill_history": h} for row, h in zip(records, histories) if h is not None]
 
         # write output JSON
         json_name = os.path.basename(json_path)
@@ -3,8 +3,9 @@ import os
 import glob
 import json
 import re
-import requests
+import threading
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 from tqdm import tqdm
@@ -19,6 +20,9 @@ logging.getLogger("pdfplumber").setLevel(logging.ERROR)
 
 import pdfplumber
 
+from fetch import fetch, fetch_many, prefetch, page_hash, PDF_TEXT_DIR
+from checkpoint import run_checkpointed
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Configuration: URLs for summaries and statuses
 # ──────────────────────────────────────────────────────────────────────────────
@@ -48,32 +52,61 @@ SESSION_STATUS_URLS = {
 }
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Fetch & cache summary soups
+# Lazy, memoized summary soups: a session's page is fetched (through the
+# on-disk cache) and parsed the first time one of its bills needs it, so
+# importing this module does no network I/O and single-session runs never
+# touch the other sessions.
 # ──────────────────────────────────────────────────────────────────────────────
-session_soups = {}
-for sess, cfg in SESSION_SUMMARY_URLS.items():
-    if isinstance(cfg, dict):
-        for prefix, url in cfg.items():
-            r = requests.get(url); r.raise_for_status()
-            session_soups[(sess, prefix)] = BeautifulSoup(r.text, 'html.parser')
-    else:
-        r = requests.get(cfg); r.raise_for_status()
-        session_soups[(sess, None)] = BeautifulSoup(r.text, 'html.parser')
+_SUMMARY_SOUPS = {}
+_SUMMARY_SOUPS_LOCK = threading.Lock()
+
+def _summary_soup(url):
+    with _SUMMARY_SOUPS_LOCK:
+        if url not in _SUMMARY_SOUPS:
+            r = fetch(url); r.raise_for_status()
+            _SUMMARY_SOUPS[url] = BeautifulSoup(r.text, 'html.parser')
+        return _SUMMARY_SOUPS[url]
+
+def get_session_soup(sess, prefix=None):
+    """Summary soup for (session, prefix); prefix is None for single-page sessions."""
+    cfg = SESSION_SUMMARY_URLS.get(sess)
+    url = cfg.get(prefix) if isinstance(cfg, dict) else cfg
+    return _summary_soup(url) if url else None
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Summary parsing functions (unchanged)
+# Summary indexes: each session summary page is walked once into a
+# BILL_ID → summary dict; parse_summary_* are then O(1) lookups.
+# The first matching row wins, as in the old per-bill scans.
 # ──────────────────────────────────────────────────────────────────────────────
-def parse_summary_69th(soup, bill_id):
+_SUMMARY_INDEXES = {}
+
+def _summary_lookup(soup, indexer, bill_id):
+    if soup is None:
+        return ''
+    key = (id(soup), indexer)
+    if key not in _SUMMARY_INDEXES:
+        # the soup is shared and the indexers decompose tags: build each index once, under the lock
+        with _SUMMARY_SOUPS_LOCK:
+            if key not in _SUMMARY_INDEXES:
+                # keep the soup alive alongside its index so id() can't be reused
+                _SUMMARY_INDEXES[key] = (soup, indexer(soup))
+    return _SUMMARY_INDEXES[key][1].get(bill_id.upper(), '')
+
+def index_summary_69th(soup):
+    out = {}
     for tr in soup.select('table tr'):
         a = tr.find('a', href=True)
         if not a: continue
-        name = a.get_text(strip=True).split('_',1)[0]
-        if name.upper() != bill_id.upper(): continue
+        name = a.get_text(strip=True).split('_',1)[0].upper()
+        if name in out: continue
         summary_tr = tr.find_next_sibling('tr')
         raw = summary_tr.find('i') if summary_tr else None
         text = raw.get_text(' ', strip=True) if raw else ''
-        return text.split('(BDR',1)[0].rstrip() if '(BDR' in text else text
-    return ''
+        out[name] = text.split('(BDR',1)[0].rstrip() if '(BDR' in text else text
+    return out
+
+def parse_summary_69th(soup, bill_id):
+    return _summary_lookup(soup, index_summary_69th, bill_id)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 70th Session helpers (new)
@@ -82,14 +115,33 @@ _70TH_DOCTYPES = {
     'AB':1, 'SB':2, 'AR':3, 'SR':4,
     'ACR':5, 'AJR':6, 'SCR':7, 'SJR':8
 }
-_70TH_SOUPS = {}
+
+def index_summary_70th(soup):
+    ###
+    # 70th (1999) HistListBills pages: every <li> holds an
+    # <a href="history.cfm?..."> bill id and an <i>…</i> description;
+    # strip the trailing "(BDR…)".
+    ###
+    out = {}
+    for li in soup.find_all('li'):
+        a = li.find('a', href=re.compile(r'history\.cfm\?ID='))
+        if not a:
+            continue
+        name = a.get_text(strip=True).upper()
+        if name in out:
+            continue
+        i = li.find('i')
+        text = i.get_text(' ', strip=True) if i else ''
+        # drop any trailing "(BDR…)"
+        if '(BDR' in text:
+            text = text.split('(BDR',1)[0].rstrip()
+        out[name] = text
+    return out
 
 def parse_summary_70th(bill_id: str) -> str:
     ###
     # 70th (1999) Session summary extractor via the HistListBills pages.
     # Picks the right Doctype page based on the bill prefix.
-    # Finds the <li> whose <a href="history.cfm?..."> text matches bill_id.
-    # Grabs the <i>…</i> inside that <li>, strips off trailing "(BDR…)".
     ###
     # figure out whether to look in Doctype=1,2,3…8
     # three-letter prefixes first (ACR, AJR, SCR, SJR), otherwise two-letter.
@@ -99,54 +151,49 @@ def parse_summary_70th(bill_id: str) -> str:
         return ''
 
     # fetch & cache the list page
-    if dt not in _70TH_SOUPS:
-        url = (
-            f"https://www.leg.state.nv.us"
-            f"/Session/70th1999/Reports/HistListBills.cfm?Doctype={dt}"
-        )
-        r = requests.get(url)
-        r.raise_for_status()
-        _70TH_SOUPS[dt] = BeautifulSoup(r.text, 'html.parser')
-    soup = _70TH_SOUPS[dt]
+    return _summary_lookup(_summary_soup(_summary_70th_url(dt)), index_summary_70th, bill_id)
 
-    # look through every <li> for our history link + description <i>
-    for li in soup.find_all('li'):
-        a = li.find('a', href=re.compile(r'history\.cfm\?ID='))
-        if not a or a.get_text(strip=True).upper() != bill_id.upper():
-            continue
-        i = li.find('i')
-        if not i:
-            return ''
-        text = i.get_text(' ', strip=True)
-        # drop any trailing "(BDR…)"
-        if '(BDR' in text:
-            text = text.split('(BDR',1)[0].rstrip()
-        return text
-    return ''
-def parse_summary_71st(soup, bill_id):
+def _summary_70th_url(dt):
+    return f"https://www.leg.state.nv.us/Session/70th1999/Reports/HistListBills.cfm?Doctype={dt}"
+
+def index_summary_71st(soup):
+    out = {}
     for a in soup.find_all('a', href=True):
-        if a.get_text(strip=True).upper() != bill_id.upper(): continue
+        name = a.get_text(strip=True).upper()
+        if name in out: continue
         tr = a.find_parent('tr'); tds = tr.find_all('td') if tr else []
         if len(tds)>=4:
             text = tds[3].get_text(' ',strip=True)
-            return text.split('(BDR',1)[0].rstrip() if '(BDR' in text else text
-    return ''
+            out[name] = text.split('(BDR',1)[0].rstrip() if '(BDR' in text else text
+    return out
 
-def parse_summary_72nd(soup, bill_id):
+def parse_summary_71st(soup, bill_id):
+    return _summary_lookup(soup, index_summary_71st, bill_id)
+
+def index_summary_72nd(soup):
+    out = {}
     for a in soup.find_all('a', href=True):
-        if a.get_text(strip=True).upper() != bill_id.upper(): continue
+        name = a.get_text(strip=True).upper()
+        if name in out: continue
         tr = a.find_parent('tr'); tds = tr.find_all('td') if tr else []
         if len(tds)>=3:
             td = tds[2]; b = td.find('b')
             if b: b.decompose()
             text = td.get_text(' ',strip=True)
-            return text.split('(BDR',1)[0].rstrip(' .') if '(BDR' in text else text
-    return ''
+            out[name] = text.split('(BDR',1)[0].rstrip(' .') if '(BDR' in text else text
+    return out
 
-def parse_summary_73rd(soup, bill_id):
+def parse_summary_72nd(soup, bill_id):
+    return _summary_lookup(soup, index_summary_72nd, bill_id)
+
+def index_summary_73rd(soup):
+    out = {}
     for a in soup.find_all('a', href=True):
-        if a.get_text(strip=True).upper() != bill_id.upper(): continue
-        tr = a.find_parent('tr'); tds = tr.find_all('td', recursive=False)
+        name = a.get_text(strip=True).upper()
+        if name in out: continue
+        tr = a.find_parent('tr')
+        if not tr: continue
+        tds = tr.find_all('td', recursive=False)
         if len(tds)>=3:
             td = tds[2]; br=td.find('br')
             if br:
@@ -157,13 +204,20 @@ def parse_summary_73rd(soup, bill_id):
                 fst=td.find('strong')
                 if fst: fst.decompose()
                 text=td.get_text(' ',strip=True)
-            return text.split('(BDR',1)[0].rstrip(' .') if '(BDR' in text else text
-    return ''
+            out[name] = text.split('(BDR',1)[0].rstrip(' .') if '(BDR' in text else text
+    return out
 
-def parse_summary_74th(soup, bill_id):
+def parse_summary_73rd(soup, bill_id):
+    return _summary_lookup(soup, index_summary_73rd, bill_id)
+
+def index_summary_74th(soup):
+    out = {}
     for a in soup.find_all('a', href=True):
-        if a.get_text(strip=True).upper() != bill_id.upper(): continue
-        tr=a.find_parent('tr'); tds=tr.find_all('td',recursive=False)
+        name = a.get_text(strip=True).upper()
+        if name in out: continue
+        tr=a.find_parent('tr')
+        if not tr: continue
+        tds=tr.find_all('td',recursive=False)
         if len(tds)<3: continue
         td=tds[2]; brs=td.find_all('br')
         if brs:
@@ -177,8 +231,11 @@ def parse_summary_74th(soup, bill_id):
             text=td.get_text(' ',strip=True)
         # drop any SJR:/AJR:/SCR:/ACR: prefix
         text = re.sub(r"\b(?:SJR:|AJR:|SCR:|ACR:)", '', text)
-        return text.split('(BDR',1)[0].rstrip(' .') if '(BDR' in text else text
-    return ''
+        out[name] = text.split('(BDR',1)[0].rstrip(' .') if '(BDR' in text else text
+    return out
+
+def parse_summary_74th(soup, bill_id):
+    return _summary_lookup(soup, index_summary_74th, bill_id)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Status parsing (unchanged)
@@ -186,7 +243,7 @@ def parse_summary_74th(soup, bill_id):
 HEADERS = {"User-Agent":"Mozilla/5.0"}
 
 def parse_status_generic(url):
-    r = requests.get(url, headers=HEADERS)
+    r = fetch(url, headers=HEADERS)
     r.raise_for_status()
     soup = BeautifulSoup(r.text, 'html.parser')
     out = {}
@@ -211,7 +268,7 @@ def parse_status_generic(url):
     return out
 
 def parse_status_74(url):
-    r=requests.get(url,headers=HEADERS); r.raise_for_status()
+    r=fetch(url,headers=HEADERS); r.raise_for_status()
     soup=BeautifulSoup(r.text,'html.parser')
     table=next((tbl for tbl in soup.find_all('table')
                 if tbl.find('a',href=re.compile(r'history\.cfm\?ID='))),
@@ -229,6 +286,7 @@ def parse_status_74(url):
     return out
 
 def load_all_statuses():
+    prefetch((url, None, HEADERS) for pair in SESSION_STATUS_URLS.values() for url in pair)
     status_map = {}
     for sess, (aurl, surl) in SESSION_STATUS_URLS.items():
         if sess in ('72nd2003','73rd2005','74th2007'):
@@ -256,18 +314,30 @@ def load_all_statuses():
 
 BASE = "https://www.leg.state.nv.us"
 
-def find_version_links(detail_url):
+def session_pages(sess):
+    """Status and summary pages metadata_record may read for a bill of this session."""
+    urls = list(SESSION_STATUS_URLS.get(sess, ()))
+    if sess == '70th1999':
+        return urls + [_summary_70th_url(dt) for dt in sorted(set(_70TH_DOCTYPES.values()))]
+    cfg = SESSION_SUMMARY_URLS.get(sess)
+    if isinstance(cfg, dict):
+        return urls + list(cfg.values())
+    return urls + ([cfg] if cfg else [])
+
+def find_version_links(detail_url, soup=None):
     """
     Try to pull out explicit HTML/pdf “Versions:” links.
     If none found, we’ll fall back to detail_url itself.
+    Pass `soup` when the detail page has already been parsed.
     """
-    try:
-        r = requests.get(detail_url)
-        r.raise_for_status()
-    except:
-        return '', ''
+    if soup is None:
+        try:
+            r = fetch(detail_url)
+            r.raise_for_status()
+        except:
+            return '', ''
+        soup = BeautifulSoup(r.text, 'html.parser')
 
-    soup = BeautifulSoup(r.text, 'html.parser')
     marker = soup.find(lambda t: t.name in ('b','strong')
                               and re.search(r'Versions:|Bill Text', t.get_text(), re.I))
 
@@ -305,6 +375,128 @@ def find_version_links(detail_url):
     return html_link, pdf_link
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# PDF titles: pdfplumber runs in a process pool, stops at the first page where
+# "AN ACT … thereto." is complete, and its result is cached by PDF content hash
+# under <cache>/pdf_text/, so re-runs never re-extract an unchanged PDF
+# (fetch.prune_cache evicts it together with the PDF body it came from).
+# ──────────────────────────────────────────────────────────────────────────────
+
+PDF_WORKERS  = int(os.environ.get("NV_PDF_WORKERS", "0")) or os.cpu_count() or 1
+
+# AN ACT … thereto. is matched from its two ends, so each page only searches its own text
+ACT_START   = re.compile(r'\bAN ACT ', flags=re.I)
+ACT_END     = re.compile(r'thereto\.', flags=re.I)
+ACT_OVERLAP = 16  # text carried over from the previous page, for a match split across the break
+
+_PDF_POOL = None
+_PDF_POOL_LOCK = threading.Lock()
+
+def _pdf_pool():
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+        return _PDF_POOL
+
+def read_pdf_act(content):
+    """
+    (act, text) for one PDF.  `act` is the first AN ACT … thereto. match,
+    checked after every page so extraction stops as soon as it is complete;
+    `text` is the whole normalized text when there is no match, else None.
+    """
+    words = []
+    act = None  # text from the first AN ACT on, once it has been seen
+    tail = ''   # last ACT_OVERLAP characters searched (of the act, once started)
+    with pdfplumber.open(BytesIO(content)) as pdf:
+        for pg in pdf.pages:
+            page = (pg.extract_text() or '').split()
+            pg.close()
+            if not page:
+                continue
+            words.extend(page)
+            new = ' '.join(page)
+            window = f'{tail} {new}' if tail else new
+            if act is None:
+                # a match lying wholly inside the carried-over tail was already seen (and rejected)
+                start = next((m for m in ACT_START.finditer(window) if m.end() > len(tail)), None)
+                if start is None:
+                    tail = window[-ACT_OVERLAP:]
+                    continue
+                window = window[start.start():]
+                end = ACT_END.search(window, len('AN ACT '))
+                if end:
+                    return window[:end.end()], None
+                act = [window]
+            else:
+                end = ACT_END.search(window)
+                if end:
+                    return ''.join(act) + ' ' + new[:end.end() - len(tail) - 1], None
+                act += [' ', new]
+            tail = window[-ACT_OVERLAP:]
+    return None, ' '.join(words)
+
+def _pdf_text_path(sha):
+    return os.path.join(PDF_TEXT_DIR, sha[:2], sha + ".json")
+
+def _load_pdf_act(sha):
+    path = _pdf_text_path(sha)
+    try:
+        with open(path, encoding="utf8") as f:
+            entry = json.load(f)
+        os.utime(path)  # last use, for prune_cache's age limit
+        return entry["act"], entry["text"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _save_pdf_act(sha, act, text):
+    path = _pdf_text_path(sha)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf8") as f:
+        json.dump({"act": act, "text": text}, f)
+    os.replace(tmp, path)
+
+def pdf_act_text(resp):
+    """
+    read_pdf_act for a fetched PDF, from the text cache or parsed right here
+    (one PDF gains nothing from the pool; prefetch_pdf_acts spreads batches).
+    """
+    cached = _load_pdf_act(resp.sha256)
+    if cached is not None:
+        return cached
+    act, text = read_pdf_act(resp.content)
+    _save_pdf_act(resp.sha256, act, text)
+    return act, text
+
+def prefetch_pdf_acts(pdf_urls):
+    """
+    Download a batch of PDFs concurrently and extract the uncached ones across
+    the pool.  Failures are skipped here and surface later from extract_act.
+    """
+    pdf_urls = list(dict.fromkeys(u for u in pdf_urls if u))
+    todo = {}
+    for resp in fetch_many(pdf_urls, return_exceptions=True):
+        if isinstance(resp, Exception) or resp.status_code >= 400:
+            continue
+        if resp.sha256 not in todo and _load_pdf_act(resp.sha256) is None:
+            todo[resp.sha256] = resp.content
+    if not todo:
+        return
+    if PDF_WORKERS > 1:
+        futures = {sha: _pdf_pool().submit(read_pdf_act, content) for sha, content in todo.items()}
+        for sha, fut in futures.items():
+            try:
+                _save_pdf_act(sha, *fut.result())
+            except Exception:
+                pass
+    else:
+        for sha, content in todo.items():
+            try:
+                _save_pdf_act(sha, *read_pdf_act(content))
+            except Exception:
+                pass
+
 def extract_act(html_url, pdf_url=''):
     """
     1) Try HTML first: look for 'AN ACT ... thereto.'
@@ -319,7 +511,7 @@ def extract_act(html_url, pdf_url=''):
         nonlocal FULL_TEXT
         if not url or not url.lower().endswith(('.htm','html')):
             return None
-        r = requests.get(url); r.raise_for_status()
+        r = fetch(url); r.raise_for_status()
         soup = BeautifulSoup(r.text, 'html.parser')
         # 1) immediate AN ACT tag
         tag = soup.find(lambda t: isinstance(t, Tag) and 'AN ACT' in t.get_text())
@@ -336,15 +528,11 @@ def extract_act(html_url, pdf_url=''):
         nonlocal FULL_TEXT
         if not url.lower().endswith('.pdf'):
             return None
-        resp = requests.get(url); resp.raise_for_status()
-        text_parts = []
-        with pdfplumber.open(BytesIO(resp.content)) as pdf:
-            for pg in pdf.pages:
-                text_parts.append((pg.extract_text() or '').replace('\n',' '))
-        FULL_TEXT = ' '.join(' '.join(text_parts).split())
-        # 1) look for AN ACT … thereto.
-        an = re.search(r'\bAN ACT .*?thereto\.', FULL_TEXT, flags=re.I)
-        return an.group(0) if an else None
+        resp = fetch(url); resp.raise_for_status()
+        # 1) look for AN ACT … thereto. (the full text only comes back without one)
+        act, text = pdf_act_text(resp)
+        FULL_TEXT = text or ''
+        return act
 
     # Try HTML version link first
     result = try_html(html_url)
@@ -389,62 +577,78 @@ def extract_act(html_url, pdf_url=''):
 # ──────────────────────────────────────────────────────────────────────────────
 # Main pipeline
 # ──────────────────────────────────────────────────────────────────────────────
-def process_metadata(input_dir, output_dir):
+def metadata_record(r, status_map, version_links=None):
+    """
+    Build one bill's metadata row.  `version_links` is the (html, pdf) pair
+    from find_version_links when the caller has already parsed the detail page.
+    """
+    sess        = r.get('session','')
+    orig_id     = r.get('state_bill_id','')
+    bill_id     = re.sub(r'\*+$','', orig_id).upper()
+    prefix      = bill_id[:2]
+
+    # summary dispatch
+    if sess=='69th1997':
+        summary = parse_summary_69th(get_session_soup(sess, prefix), bill_id)
+    elif sess=='70th1999':
+        summary = parse_summary_70th(bill_id)
+    elif sess=='71st2001':
+        summary = parse_summary_71st(get_session_soup(sess,bill_id[0]), bill_id)
+    elif sess=='72nd2003':
+        summary = parse_summary_72nd(get_session_soup(sess), bill_id)
+    elif sess=='73rd2005':
+        summary = parse_summary_73rd(get_session_soup(sess), bill_id)
+    elif sess=='74th2007':
+        summary = parse_summary_74th(get_session_soup(sess), bill_id)
+    else:
+        summary = ''
+
+    # status override for 69th
+    if sess=='69th1997':
+        stat = "Approved by Governor"
+    else:
+        stat = status_map.get(sess,{}).get(prefix,{}).get(bill_id,'') or ''
+
+    # override plain 'Governor' or 'Chapter ###.' statuses
+    if re.match(r'^(governor|chapter\s*\d+\.?)$', stat, re.I):
+        stat = 'Approved by Governor'
+
+    # metadata / title
+    detail_url    = r.get('Link','')
+    html_link, pdf_link = version_links or find_version_links(detail_url)
+    act_text      = extract_act(html_link, pdf_link)
+
+    return {
+        'uuid':           r.get('uuid',''),
+        'state':          r.get('state',''),
+        'session':        r.get('session',''),
+        'state_bill_id':  bill_id,
+        'state_url':      detail_url,
+        'title':          act_text or 'NA',
+        'description':    summary or 'NA',
+        'status':         stat or 'NA'
+    }
+
+def process_metadata(input_dir, output_dir, resume=True):
     status_map = load_all_statuses()
     os.makedirs(output_dir, exist_ok=True)
     for jf in tqdm(glob.glob(os.path.join(input_dir,'bills_*.json')), desc="Processing metadata"):
         recs = json.load(open(jf, encoding='utf8'))
-        out = []
-        for r in recs:
-            sess        = r.get('session','')
-            orig_id     = r.get('state_bill_id','')
-            bill_id     = re.sub(r'\*+$','', orig_id).upper()
-            prefix      = bill_id[:2]
-
-            # summary dispatch
-            if sess=='69th1997':
-                soup = session_soups.get((sess, prefix))
-                summary = parse_summary_69th(soup, bill_id)
-            elif sess=='70th1999':
-                summary = parse_summary_70th(bill_id)
-            elif sess=='71st2001':
-                summary = parse_summary_71st(session_soups.get((sess,bill_id[0])), bill_id)
-            elif sess=='72nd2003':
-                summary = parse_summary_72nd(session_soups.get((sess,None)), bill_id)
-            elif sess=='73rd2005':
-                summary = parse_summary_73rd(session_soups.get((sess,None)), bill_id)
-            elif sess=='74th2007':
-                summary = parse_summary_74th(session_soups.get((sess,None)), bill_id)
-            else:
-                summary = ''
-
-            # status override for 69th
-            if sess=='69th1997':
-                stat = "Approved by Governor"
-            else:
-                stat = status_map.get(sess,{}).get(prefix,{}).get(bill_id,'') or ''
-
-            # override plain 'Governor' or 'Chapter ###.' statuses
-            if re.match(r'^(governor|chapter\s*\d+\.?)$', stat, re.I):
-                stat = 'Approved by Governor'
-
-            # metadata / title
-            detail_url    = r.get('Link','')
-            html_link, pdf_link = find_version_links(detail_url)
-            act_text      = extract_act(html_link, pdf_link)
-
-            
-
-            out.append({
-                'uuid':           r.get('uuid',''),
-                'state':          r.get('state',''),
-                'session':        r.get('session',''),
-                'state_bill_id':  bill_id,
-                'state_url':      detail_url,
-                'title':          act_text or 'NA',
-                'description':    summary or 'NA',
-                'status':         stat or 'NA'
-            })
+        prefetch(r.get('Link','') for r in recs)
+
+        # version links of the bills to (re)process, and their title PDFs extracted
+        # across the pool up front (bills without an HTML version go straight to the PDF)
+        links = {}
+        def prepare(pending):
+            for r in pending:
+                links[r.get('Link','')] = find_version_links(r.get('Link',''))
+            prefetch_pdf_acts(pdf for html, pdf in links.values()
+                              if pdf and not html.lower().endswith(('.htm','html')))
+
+        out = run_checkpointed("metadata", jf, output_dir, recs,
+                               lambda r: metadata_record(r, status_map, links.get(r.get('Link',''))),
+                               source_of=lambda r: page_hash(r.get('Link','')), resume=resume,
+                               prepare=prepare)
 
         fn = os.path.basename(jf).replace('bills_','metadata_')
         with open(os.path.join(output_dir,fn),'w',encoding='utf8') as wf:
@@ -1,14 +1,123 @@
-import os, json, argparse, sys
+import os, json, gzip, argparse, sys
 from argparse import RawDescriptionHelpFormatter
 
+from bill_index import open_index, MemoryIndex
+
+# category → output base name, as written by combiner.py
+DATASETS = {
+    "metadata": "bill_metadata",
+    "history":  "bill_history",
+    "sponsors": "sponsors",
+    "votes":    "votes",
+}
+
 def load_json(filename):
     with open(filename, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def load_dataset(input_dir, base):
+    """Whichever of base.json / .jsonl / .json.gz / .jsonl.gz the combiner wrote."""
+    for ext in (".json", ".jsonl", ".json.gz", ".jsonl.gz"):
+        path = os.path.join(input_dir, base + ext)
+        if not os.path.exists(path):
+            continue
+        opener = gzip.open if ext.endswith(".gz") else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            if ext.startswith(".jsonl"):
+                return [json.loads(line) for line in f if line.strip()]
+            return json.load(f)
+    raise FileNotFoundError(os.path.join(input_dir, base + ".json"))
+
 def match(rec, filters):
     return all(filters[k] is None or str(rec.get(k,'')).lower() == filters[k].lower()
                for k in filters)
 
+def query_bill(filters, index=None, data=None):
+    """
+    Assemble one bill's metadata/history/sponsors/votes, either by seeking
+    through the combiner's sqlite index or by scanning fully loaded datasets.
+    """
+    if index is not None:
+        md   = next(iter(index.find("metadata", filters, limit=1)), None) or {}
+        hist = next((r.get("bill_history") for r in index.find("history", filters, limit=1)), {})
+        sp   = [s for r in index.find("sponsors", filters) for s in r.get("sponsors", [])]
+        vt   = [v for r in index.find("votes", filters) for v in r.get("votes", [])]
+    else:
+        # find single metadata record
+        md = next((r for r in data["metadata"] if match(r, filters)), None) or {}
+        # find single history entry
+        hist = next((r.get("bill_history") for r in data["history"] if match(r, filters)), {})
+
+        # flatten sponsors list
+        sp = [
+            s
+            for r in data["sponsors"] if match(r, filters)
+            for s in r.get("sponsors", [])
+        ]
+        # flatten votes list
+        vt = [
+            v
+            for r in data["votes"] if match(r, filters)
+            for v in r.get("votes", [])
+        ]
+
+    return {
+        "metadata": md,
+        "bill_history": hist,
+        "sponsors": sp,
+        "votes": vt
+    }
+
+def parse_batch_line(line):
+    """
+    One batch query per line: a bare uuid, a JSON object with any of
+    uuid/state/session/state_bill_id, or state,session,state_bill_id
+    (comma- or tab-separated).
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    filters = dict.fromkeys(("uuid", "state", "session", "state_bill_id"))
+    if line.startswith('{'):
+        rec = json.loads(line)
+        # keys are text in the data; {"session": 2021} means "2021"
+        filters.update({k: str(rec[k]) for k in filters if rec.get(k) is not None})
+    else:
+        parts = [p.strip() for p in line.replace('\t', ',').split(',')]
+        if len(parts) == 1:
+            filters["uuid"] = parts[0]
+        elif len(parts) == 3:
+            filters["state"], filters["session"], filters["state_bill_id"] = parts
+        else:
+            raise ValueError(f"can't parse batch query: {line!r}")
+    return filters
+
+def run_batch(lines, input_dir, out):
+    """
+    Answer every query from a single index open (or a single load), one JSON
+    line each.  A line that can't be parsed or answered gets an
+    {"query": ..., "error": ...} line and the batch carries on.
+    """
+    index = open_index(input_dir)
+    if index is None:
+        index = MemoryIndex({cat: load_dataset(input_dir, base) for cat, base in DATASETS.items()})
+    n = 0
+    try:
+        for line in lines:
+            try:
+                filters = parse_batch_line(line)
+                if filters is None:
+                    continue
+                query = {k: v for k, v in filters.items() if v is not None}
+                record = {"query": query, **query_bill(filters, index=index)}
+            except Exception as e:
+                record = {"query": line.strip(), "error": f"{type(e).__name__}: {e}"}
+            out.write(json.dumps(record) + "\n")
+            n += 1
+    finally:
+        index.close()
+    return n
+
 def main():
     p = argparse.ArgumentParser(
         description="Query bill data by uuid, state, session, state_bill_id",
@@ -20,12 +129,19 @@ Examples:
 
   # Query by UUID only and dump to file
   python code\query.py --uuid NV70th1999AB444 > result.json
+
+  # Batch: one uuid, "state,session,state_bill_id" or JSON object per line;
+  # answers stream out as JSON Lines ("-" reads stdin)
+  python code\query.py --batch bills.txt --out results.jsonl
+  type bills.txt | python code\query.py --batch -
 """
     )
     p.add_argument("--uuid")
     p.add_argument("--state")
     p.add_argument("--session")
     p.add_argument("--state_bill_id")
+    p.add_argument("--batch", metavar="FILE", help="file of queries, one per line ('-' for stdin)")
+    p.add_argument("--out", metavar="FILE", help="batch output file (default: stdout)")
     args = p.parse_args()
     filters = {
         "uuid": args.uuid,
@@ -38,36 +154,28 @@ Examples:
     input_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "output"))
     outdir    = os.path.join(input_dir, "query")
 
-    # load all four datasets from input_dir
-    meta     = load_json(os.path.join(input_dir, "bill_metadata.json"))
-    history  = load_json(os.path.join(input_dir, "bill_history.json"))
-    sponsors = load_json(os.path.join(input_dir, "sponsors.json"))
-    votes    = load_json(os.path.join(input_dir, "votes.json"))
-
-    # find single metadata record
-    md = next((r for r in meta if match(r, filters)), None) or {}
-    # find single history entry
-    hist = next((r.get("bill_history") for r in history if match(r, filters)), {})
-
-    # flatten sponsors list
-    sp = [
-        s
-        for r in sponsors if match(r, filters)
-        for s in r.get("sponsors", [])
-    ]
-    # flatten votes list
-    vt = [
-        v
-        for r in votes if match(r, filters)
-        for v in r.get("votes", [])
-    ]
-
-    out = {
-        "metadata": md,
-        "bill_history": hist,
-        "sponsors": sp,
-        "votes": vt
-    }
+    if args.batch:
+        src = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')
+        dst = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+        try:
+            n = run_batch(src, input_dir, dst)
+        finally:
+            if src is not sys.stdin:
+                src.close()
+            if dst is not sys.stdout:
+                dst.close()
+        print(f"Answered {n} queries", file=sys.stderr)
+        return
+
+    # seek through the combiner's index when it is there and up to date,
+    # otherwise load all four datasets from input_dir
+    index = open_index(input_dir)
+    if index is not None:
+        out = query_bill(filters, index=index)
+        index.close()
+    else:
+        data = {cat: load_dataset(input_dir, base) for cat, base in DATASETS.items()}
+        out = query_bill(filters, data=data)
 
     # write to file named by args
     if args.uuid:
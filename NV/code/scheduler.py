@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Tiny dependency scheduler for the NV stages.
+#
+# A stage is a dict: {"name", "fn", "kwargs", "deps"}.  Every stage whose deps
+# have finished is started right away in a thread (or process) pool, so the
+# whole run takes as long as its critical path.  All stages read and write the
+# same fetch cache, which is safe to share between threads and processes.
+# ──────────────────────────────────────────────────────────────────────────────
+
+EXECUTORS = {
+    "thread":  ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def stage(name, fn, deps=(), **kwargs):
+    return {"name": name, "fn": fn, "kwargs": kwargs, "deps": tuple(deps)}
+
+
+def _check(stages):
+    names = [s["name"] for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"duplicate stage names in {names}")
+    for s in stages:
+        missing = [d for d in s["deps"] if d not in names]
+        if missing:
+            raise ValueError(f"stage {s['name']!r} depends on unknown stage(s) {missing}")
+    # Kahn's algorithm, only to reject cycles before anything runs
+    remaining = {s["name"]: set(s["deps"]) for s in stages}
+    while remaining:
+        ready = [n for n, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"dependency cycle among {sorted(remaining)}")
+        for n in ready:
+            del remaining[n]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _timed(fn, kwargs, report=None):
+    start = time.perf_counter()
+    fn(**kwargs)
+    return time.perf_counter() - start, report() if report else None
+
+
+def run_stages(stages, max_workers=None, executor="thread", worker_report=None, merge_report=None):
+    """
+    Run `stages` respecting their deps, as many at once as max_workers allows.
+    Stops scheduling new stages after the first failure and re-raises it once
+    the running ones finish.  Returns {stage name: wall seconds}.
+
+    With the process executor, each stage's worker calls worker_report() when
+    the stage ends and the parent passes the result to merge_report(), so
+    per-process counters (cache hits, request metrics) are not lost.
+    """
+    _check(stages)
+    pending = {s["name"]: s for s in stages}
+    done, timings, running = set(), {}, {}
+    failure = None
+    t0 = time.perf_counter()
+    report = worker_report if executor == "process" else None
+
+    with EXECUTORS[executor](max_workers=max_workers or len(stages)) as pool:
+        while pending or running:
+            if failure is None:
+                for name, s in list(pending.items()):
+                    if all(d in done for d in s["deps"]):
+                        print(f"[scheduler] start {name}")
+                        running[pool.submit(_timed, s["fn"], s["kwargs"], report)] = name
+                        del pending[name]
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                try:
+                    timings[name], stats = fut.result()
+                except Exception as e:
+                    print(f"[scheduler] {name} failed: {e!r}")
+                    failure = failure or e
+                    continue
+                if stats is not None and merge_report is not None:
+                    merge_report(stats)
+                done.add(name)
+                print(f"[scheduler] done  {name} in {timings[name]:.1f}s")
+
+    total = time.perf_counter() - t0
+    print_timings(timings, total)
+    if failure is not None:
+        raise failure
+    return timings
+
+
+def print_timings(timings, total):
+    print("Stage wall times:")
+    for name, secs in timings.items():
+        print(f"  {name:<16} {secs:8.1f}s")
+    print(f"  {'total':<16} {total:8.1f}s  (sum of stages {sum(timings.values()):.1f}s)")
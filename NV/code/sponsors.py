@@ -2,16 +2,18 @@ import os
 import re
 import glob
 import json
-import requests
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+from fetch import fetch, page_hash
+from checkpoint import run_checkpointed, source_hash
+
 # ———————————————————————————————————————————————————————————————
 # utils
 # ———————————————————————————————————————————————————————————————
 
 def get_soup(url):
-    resp = requests.get(url)
+    resp = fetch(url)
     resp.raise_for_status()
     return BeautifulSoup(resp.text, "html.parser")
 
@@ -22,16 +24,32 @@ def normalize_sponsor_list(raw_list):
     """
     return [", ".join(raw_list)] if len(raw_list) > 1 else raw_list
 
-def load_sponsor_names(json_path, state_bill_id):
+_SPONSOR_INDEXES = {}
+
+def load_sponsor_index(json_path):
+    """
+    Inverted index BILL_ID (upper-case) → sponsor names, in file order.
+    Each sponsor file is read once and shared by every bill; it is reloaded
+    only if sponsor_search rewrites it.
+    """
     if not os.path.exists(json_path):
-        return []
+        return {}
+    mtime = os.path.getmtime(json_path)
+    cached = _SPONSOR_INDEXES.get(json_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
     with open(json_path, encoding='utf8') as f:
         entries = json.load(f)
-    return [
-        rec['Name']
-        for rec in entries
-        if any(state_bill_id.upper() == bn.upper() for bn in rec.get('Billnames', []))
-    ]
+    index = {}
+    for rec in entries:
+        # a sponsor is listed once per bill, however often the bill repeats
+        for bn in dict.fromkeys(bn.upper() for bn in rec.get('Billnames', [])):
+            index.setdefault(bn, []).append(rec['Name'])
+    _SPONSOR_INDEXES[json_path] = (mtime, index)
+    return index
+
+def load_sponsor_names(json_path, state_bill_id):
+    return list(load_sponsor_index(json_path).get(state_bill_id.upper(), []))
 
 # ———————————————————————————————————————————————————————————————
 # session‐specific config
@@ -97,19 +115,24 @@ SESSION_CFG = {
 # 69th tracking page handler
 # ———————————————————————————————————————————————————————————————
 
+def track_69th_url(state_bill_id):
+    prefix = state_bill_id[:2].upper()
+    if prefix not in ("AB", "SB"):
+        return ""
+    page = "abResults.cfm" if prefix=="AB" else "sbResults.cfm"
+    return f"https://www.leg.state.nv.us/Session/69th1997/tracking/{page}"
+
 def track_69th(link, state_bill_id):
     """
     Always returns one sponsor entry + one cosponsor:none
     """
-    prefix = state_bill_id[:2].upper()
-    if prefix not in ("AB", "SB"):
+    url = track_69th_url(state_bill_id)
+    if not url:
         return [
             {"sponsor_name": "none",     "sponsor_type": "sponsor"},
             {"sponsor_name": "none",     "sponsor_type": "cosponsor"},
         ]
 
-    page = "abResults.cfm" if prefix=="AB" else "sbResults.cfm"
-    url  = f"https://www.leg.state.nv.us/Session/69th1997/tracking/{page}"
     track = get_soup(url)
 
     sponsor_text = None
@@ -136,7 +159,30 @@ def track_69th(link, state_bill_id):
 # generic sponsor parser
 # ———————————————————————————————————————————————————————————————
 
-def parse_sponsors(session, link, state_bill_id):
+def fallback_sponsor(session, soup):
+    """Sponsor named on the bill detail page itself, per the session's fallback rule."""
+    cfg = SESSION_CFG.get(session, {}).get("fallback")
+    if not cfg:
+        return ""
+    tagname, pat = cfg["tag"]
+    tag = soup.find(tagname, string=re.compile(pat, re.I))
+    return cfg["extract"](soup, tag) if tag else ""
+
+def sponsor_source(session, link, state_bill_id):
+    """
+    Hash of everything parse_sponsors reads for a bill: the sponsor-file
+    entries, plus the detail page when the sponsor comes from the fallback.
+    """
+    cfg = SESSION_CFG.get(session)
+    if not cfg:
+        return ""
+    if cfg.get("handler") == "track_69th":
+        return source_hash(page_hash(track_69th_url(state_bill_id)))
+    pnames = load_sponsor_names(cfg["primary"], state_bill_id)
+    cnames = load_sponsor_names(cfg["secondary"], state_bill_id)
+    return source_hash(pnames, cnames, "" if pnames else page_hash(link))
+
+def parse_sponsors(session, link, state_bill_id, soup=None):
     cfg = SESSION_CFG.get(session)
     if not cfg:
         return []
@@ -151,11 +197,10 @@ def parse_sponsors(session, link, state_bill_id):
     if pnames:
         sponsors += [{"sponsor_name":n, "sponsor_type":"sponsor"} for n in pnames]
     else:
-        # fallback: fetch bill page only now
-        soup = get_soup(link)
-        tagname, pat = cfg["fallback"]["tag"]
-        tag = soup.find(tagname, string=re.compile(pat, re.I))
-        name = cfg["fallback"]["extract"](soup, tag) if tag else ""
+        # fallback: fetch bill page only now (unless the caller already parsed it)
+        if soup is None:
+            soup = get_soup(link)
+        name = fallback_sponsor(session, soup)
         sponsors.append({
             "sponsor_name": name or "none",
             "sponsor_type": "sponsor"
@@ -174,20 +219,17 @@ def parse_sponsors(session, link, state_bill_id):
 # driver
 # ———————————————————————————————————————————————————————————————
 
-def process_sponsors(input_dir, output_dir):
+def process_sponsors(input_dir, output_dir, resume=True):
     os.makedirs(output_dir, exist_ok=True)
     for inp in tqdm(glob.glob(os.path.join(input_dir, "bills_*.json")), desc="Processing sponsors"):
-        out = []
         print(f"Processing {inp}")
         with open(inp, encoding='utf8') as f:
             bills = json.load(f)
-        for row in bills:
-            sess = row.get("session","")
-            link = row.get("Link","")
-            sbid = row.get("state_bill_id","")
-            #print(f"→ {sess} {sbid}")
-            sponsors = parse_sponsors(sess, link, sbid)
-            out.append({**row, "sponsors": sponsors})
+        args = lambda row: (row.get("session",""), row.get("Link",""), row.get("state_bill_id",""))
+        sponsors = run_checkpointed("sponsors", inp, output_dir, bills,
+                                    lambda row: parse_sponsors(*args(row)),
+                                    source_of=lambda row: sponsor_source(*args(row)), resume=resume)
+        out = [{**row, "sponsors": sp} for row, sp in zip(bills, sponsors)]
         with open(os.path.join(output_dir, os.path.basename(inp)), "w", encoding='utf8') as f:
             json.dump(out, f, indent=2)
 
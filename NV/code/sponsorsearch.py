@@ -1,16 +1,14 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import os
 import urllib.parse
-from tqdm import tqdm
+
+from fetch import fetch, fetch_many
 
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
-def get_sponsor_list(search_url, form_action):
-    resp = requests.get(search_url, headers=HEADERS)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
+def parse_sponsor_list(html, form_action):
+    soup = BeautifulSoup(html, "html.parser")
 
     selects = soup.select(f"form[action='{form_action}'] select[name='SponsorID']")
     sponsors = []
@@ -29,10 +27,8 @@ def get_sponsor_list(search_url, form_action):
             })
     return sponsors
 
-def fetch_bills_for(sponsor_id, results_url):
-    resp = requests.post(results_url, headers=HEADERS, data={"SponsorID": sponsor_id})
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
+def parse_bills(html):
+    soup = BeautifulSoup(html, "html.parser")
 
     bills = []
     tbl = soup.find("table", {"cellspacing": "2"})
@@ -41,49 +37,92 @@ def fetch_bills_for(sponsor_id, results_url):
             bills.append(a.text.strip())
     return bills
 
+def get_sponsor_list(search_url, form_action):
+    resp = fetch(search_url, headers=HEADERS)
+    resp.raise_for_status()
+    return parse_sponsor_list(resp.text, form_action)
+
+def fetch_bills_for(sponsor_id, results_url):
+    resp = fetch(results_url, headers=HEADERS, data={"SponsorID": sponsor_id})
+    resp.raise_for_status()
+    return parse_bills(resp.text)
+
+def _session_pages(session_code):
+    base = f"https://www.leg.state.nv.us/Session/{session_code}/Reports/"
+    return {
+        # kind: (search page, results page, form action)
+        "primary":   (urllib.parse.urljoin(base, "PrimeSponsorSearch.cfm"),
+                      urllib.parse.urljoin(base, "PrimeSponsorResults.cfm"),
+                      "PrimeSponsorResults.cfm"),
+        "secondary": (urllib.parse.urljoin(base, "SponsorSearch.cfm"),
+                      urllib.parse.urljoin(base, "SponsorResults.cfm"),
+                      "SponsorResults.cfm"),
+    }
+
+def scrape_sessions(session_codes, output_dir):
+    """
+    Scrape primary and secondary sponsor lists for several sessions at once.
+    Every session's search pages go out as one concurrent batch, then every
+    per-sponsor POST (all sessions, both kinds) as a second batch over the
+    shared async client, so the per-host cap applies to the whole stage.
+    """
+    pages = {sess: _session_pages(sess) for sess in session_codes}
+    jobs = [(sess, kind) for sess in session_codes for kind in ("primary", "secondary")]
+
+    # 1) sponsor search pages
+    search_resps = fetch_many([(pages[sess][kind][0], None, HEADERS) for sess, kind in jobs])
+    lists = {}
+    for (sess, kind), resp in zip(jobs, search_resps):
+        resp.raise_for_status()
+        lists[(sess, kind)] = parse_sponsor_list(resp.text, pages[sess][kind][2])
+
+    # 2) one POST per sponsor
+    posts = [(sess, kind, s) for sess, kind in jobs for s in lists[(sess, kind)]]
+    bill_resps = fetch_many([(pages[sess][kind][1], {"SponsorID": s["sponsorID"]}, HEADERS)
+                             for sess, kind, s in posts])
+    found = {}
+    for (sess, kind, s), resp in zip(posts, bill_resps):
+        resp.raise_for_status()
+        found[(sess, kind, s["sponsorID"])] = parse_bills(resp.text)
+
+    # 3) assemble per session, exactly as the sequential version did
+    for sess in session_codes:
+        primary = lists[(sess, "primary")]
+        for s in primary:
+            s["Billnames"] = found[(sess, "primary", s["sponsorID"])]
+
+        # Build a map of sponsorID → set(primary bills)
+        primary_map = {s["sponsorID"]: set(s["Billnames"]) for s in primary}
+
+        secondary = lists[(sess, "secondary")]
+        for s in secondary:
+            all_bills = found[(sess, "secondary", s["sponsorID"])]
+            # drop any that also appear as primary
+            prim_bills = primary_map.get(s["sponsorID"], set())
+            s["Billnames"] = [b for b in all_bills if b not in prim_bills]
+
+        # Write out JSON under output_dir/{primary,secondary}/{session_code}.json
+        for kind, data in (("primary", primary), ("secondary", secondary)):
+            kind_dir = os.path.join(output_dir, kind)
+            os.makedirs(kind_dir, exist_ok=True)
+
+            out_path = os.path.join(kind_dir, f"{sess}.json")
+            with open(out_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+            print(f"[{sess}][{kind}] Wrote {len(data)} sponsors → {out_path}")
+
 def scrape_session(session_code, input_dir, output_dir):
     """
     session_code: e.g. "70th1999"
     input_dir:    not used here, but could point to basedata if you ever want to join
     output_dir:   base directory under which we’ll write `primary/` and `secondary/`
     """
-    base = f"https://www.leg.state.nv.us/Session/{session_code}/Reports/"
-
-    # Primary sponsors
-    prim_search  = urllib.parse.urljoin(base, "PrimeSponsorSearch.cfm")
-    prim_results = urllib.parse.urljoin(base, "PrimeSponsorResults.cfm")
-    primary = get_sponsor_list(prim_search, "PrimeSponsorResults.cfm")
-    for s in primary:
-        s["Billnames"] = fetch_bills_for(s["sponsorID"], prim_results)
-
-    # Build a map of sponsorID → set(primary bills)
-    primary_map = {s["sponsorID"]: set(s["Billnames"]) for s in primary}
-
-    # Secondary sponsors
-    sec_search  = urllib.parse.urljoin(base, "SponsorSearch.cfm")
-    sec_results = urllib.parse.urljoin(base, "SponsorResults.cfm")
-    secondary = get_sponsor_list(sec_search, "SponsorResults.cfm")
-    for s in secondary:
-        all_bills = fetch_bills_for(s["sponsorID"], sec_results)
-        # drop any that also appear as primary
-        prim_bills = primary_map.get(s["sponsorID"], set())
-        s["Billnames"] = [b for b in all_bills if b not in prim_bills]
-
-    # Write out JSON under output_dir/{primary,secondary}/{session_code}.json
-    for kind, data in (("primary", primary), ("secondary", secondary)):
-        kind_dir = os.path.join(output_dir, kind)
-        os.makedirs(kind_dir, exist_ok=True)
-
-        out_path = os.path.join(kind_dir, f"{session_code}.json")
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-        print(f"[{session_code}][{kind}] Wrote {len(data)} sponsors → {out_path}")
+    scrape_sessions([session_code], output_dir)
 
 def sponsor_search(input_dir, output_dir):
     sessions = ["70th1999", "71st2001", "72nd2003", "73rd2005", "74th2007"]
-    for sess in tqdm(sessions, desc="Sponsor search"):
-        scrape_session(sess, input_dir, output_dir)
+    scrape_sessions(sessions, output_dir)
 
 if __name__ == "__main__":
     sponsor_search(input_dir="basedata", output_dir="sponsors")
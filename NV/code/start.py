@@ -1,3 +1,5 @@
+import argparse
+
 from index_to_json import bill_index_to_json
 from basedata import process_basedata
 from metadata import process_metadata
@@ -5,28 +7,67 @@ from sponsors import process_sponsors
 from sponsorsearch import sponsor_search
 from history import process_history
 from votes import process_votes
+from billpage import process_bill_pages
 from combiner import process_combiner
+from fetch import print_cache_stats, print_http_metrics, prune_cache, take_worker_stats, merge_worker_stats
+from scheduler import stage, run_stages
 
 
-if __name__ == '__main__':
-    #Create the Base Set of JSON files
-    bill_index_to_json(script_dir="NV/intermediate/index_to_json")
-    process_basedata(input_dir="NV/intermediate/index_to_json", output_dir="NV/intermediate/basedata")
+def base_stages():
+    # sponsor_search scrapes the sponsor pages directly, so it does not wait on the bill index
+    return [
+        stage("index_to_json",  bill_index_to_json, script_dir="NV/intermediate/index_to_json"),
+        stage("basedata",       process_basedata,   deps=["index_to_json"],
+              input_dir="NV/intermediate/index_to_json", output_dir="NV/intermediate/basedata"),
+        stage("sponsor_search", sponsor_search,
+              input_dir="NV/intermediate/basedata", output_dir="NV/intermediate/sponsors"),
+    ]
+
 
+def fused_stages():
+    #process_bill_pages parses each detail page a single time and writes the metadata,
+    #sponsors, history and votes intermediates together (sponsors are looked up in sponsor_search's output).
+    return base_stages() + [
+        stage("bill_pages", process_bill_pages, deps=["basedata", "sponsor_search"],
+              input_dir="NV/intermediate/basedata", output_dir="NV/intermediate"),
+        stage("combiner",   process_combiner,   deps=["bill_pages"],
+              input_dir="NV/intermediate", output_dir="NV/output"),
+    ]
 
 
+def split_stages():
+    #One stage per intermediate folder; only sponsors needs sponsor_search, the rest run side by side.
+    per_bill = [
+        ("metadata", process_metadata, ["basedata"]),
+        ("sponsors", process_sponsors, ["basedata", "sponsor_search"]),
+        ("history",  process_history,  ["basedata"]),
+        ("votes",    process_votes,    ["basedata"]),
+    ]
+    return base_stages() + [
+        stage(name, fn, deps=deps, input_dir="NV/intermediate/basedata", output_dir=f"NV/intermediate/{name}")
+        for name, fn, deps in per_bill
+    ] + [
+        stage("combiner", process_combiner, deps=[name for name, _, _ in per_bill],
+              input_dir="NV/intermediate", output_dir="NV/output"),
+    ]
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description="Run the NV pipeline")
+    p.add_argument("--split", action="store_true",
+                   help="run metadata/sponsors/history/votes as separate concurrent stages instead of process_bill_pages")
+    p.add_argument("--executor", choices=["thread", "process"], default="thread")
+    p.add_argument("--workers", type=int, default=None)
+    args = p.parse_args()
 
-    #Then u can run any or all of the following functions to process the data.
-    #Just make sure to run sponsor_search before process_sponsors
+    stages = split_stages() if args.split else fused_stages()
+    run_stages(stages, max_workers=args.workers, executor=args.executor,
+               worker_report=take_worker_stats, merge_report=merge_worker_stats)
 
-    process_metadata(input_dir="NV/intermediate/basedata", output_dir="NV/intermediate/metadata")
-    sponsor_search(input_dir="NV/intermediate/basedata", output_dir="NV/intermediate/sponsors")
-    process_sponsors(input_dir="NV/intermediate/basedata", output_dir="NV/intermediate/sponsors")
-    process_history(input_dir="NV/intermediate/basedata", output_dir="NV/intermediate/history")
-    process_votes(input_dir="NV/intermediate/basedata", output_dir="NV/intermediate/votes")
-    
-    
-    # Finally, combine all the JSON files into a single output directory
-    process_combiner(input_dir="NV/intermediate", output_dir="NV/output")
+    # Every stage shares NV/intermediate/cache, so a bill page is downloaded once per run.
+    # Under --executor process the counters come back from the workers with each finished stage.
+    print_cache_stats()
+    print_http_metrics()
+    prune_cache()
 
-    print("All processing complete. Output files are in the 'output' directory.")
\ No newline at end of file
+    print("All processing complete. Output files are in the 'output' directory.")
@@ -3,32 +3,15 @@ import glob
 import csv
 import json
 import re
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from tqdm import tqdm
 from urllib.parse import urljoin
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 
-# —————————————————————————————————————————————————————————————————————
-# DATE_FORMATS & parse_date same as you have them
-DATE_FORMATS = [
-    "%m/%d/%y",
-    "%b %d, %Y",
-    "%B %d, %Y",
-    "%b-%d-%Y",
-    "%b.%d,%Y",
-    "%b. %d, %Y",
-]
-
-def parse_date(txt):
-    txt = txt.strip()
-    for fmt in DATE_FORMATS:
-        try:
-            return datetime.strptime(txt, fmt).strftime("%Y-%m-%d")
-        except ValueError:
-            pass
-    return txt  # fallback
+from fetch import fetch, fetch_many, prefetch, page_hash
+from checkpoint import run_checkpointed
 
+# —————————————————————————————————————————————————————————————————————
 def prefix_for(chamber_text):
     low = chamber_text.lower()
     if "assembly" in low:
@@ -39,18 +22,23 @@ def prefix_for(chamber_text):
 
 # —————————————————————————————————————————————————————————————————————
 
-def parse_votes(detail_url, session):
-    votes = []
-    # 1) load the bill detail page
-    r = requests.get(detail_url)
-    soup = BeautifulSoup(r.text, 'html.parser')
-    # debug dump of outer page
-    #os.makedirs('voteouter', exist_ok=True)
-    #with open(f'voteouter/{os.path.basename(detail_url)}.html', 'w', encoding='utf8') as f:
-    #    f.write(soup.prettify())
-
-    # 2) find each vote link
-    for a in soup.find_all('a', href=re.compile(r'BillVote\.cfm\?VoteID=')):
+# Vote pages are parsed in a process pool once a batch has at least this many;
+# NV_VOTE_WORKERS=1 keeps parsing in-process.
+VOTE_WORKERS  = int(os.environ.get("NV_VOTE_WORKERS", "0")) or os.cpu_count() or 1
+MIN_POOL_SIZE = 64
+
+VOTE_LINK = re.compile(r'BillVote\.cfm\?VoteID=')
+VOTE_ID   = re.compile(r'VoteID=(\d+)')
+
+def vote_key(session, vote_url):
+    """A roll call is identified by its session and VoteID, whichever anchor links to it."""
+    m = VOTE_ID.search(vote_url)
+    return (session, m.group(1) if m else vote_url)
+
+def find_vote_links(soup, detail_url):
+    """Every BillVote.cfm link on a bill detail page as (vote_url, chamber, description)."""
+    links = []
+    for a in soup.find_all('a', href=VOTE_LINK):
         href = a['href']
         vote_url = urljoin(detail_url, href)
 
@@ -64,97 +52,175 @@ def parse_votes(detail_url, session):
             chamber = 'S'
         else:
             chamber = 'H'
-
-        # 3) fetch the vote page
-        vr = requests.get(vote_url)
-        vsoup = BeautifulSoup(vr.text, 'html.parser')
-        #os.makedirs('voteinner', exist_ok=True)
-        #with open(f'voteinner/{os.path.basename(vote_url)}.html', 'w', encoding='utf8') as f:
-        #    f.write(vsoup.prettify())
-
-        # 4) extract date from <font size="+2"> … on MM-DD
-        date_iso = ''
-        font_tag = vsoup.find('font', {'size': '+2'})
-        if font_tag:
-            header = font_tag.get_text(" ", strip=True)
-            m = re.search(r'on\s+(\d{1,2})-(\d{1,2})(?:-(\d{2,4}))?', header)
-            if m:
-                mm, dd, yy = m.groups()
-                if yy:
-                    year = yy if len(yy) == 4 else '20' + yy
-                else:
-                    year = session[-4:] if len(session) >= 4 else ''
-                if year:
-                    date_iso = f"{int(year):04d}-{int(mm):02d}-{int(dd):02d}"
-
-        # 5) locate the summary & roll-call tables
-        summary_tbl = roll_tbl = None
-        if font_tag:
-            tables = font_tag.find_all_next('table')
-            if len(tables) >= 1:
-                summary_tbl = tables[0]
-            if len(tables) >= 2:
-                roll_tbl = tables[1]
-
-        # 6) parse summary counts
-        yeas = nays = other = total = 0
-        if summary_tbl:
-            tds = summary_tbl.find_all('td')
-            for td in tds:
-                txt = td.get_text(" ", strip=True)
-                m = re.match(r'(\d+)\s+(.+)', txt)
-                if not m:
-                    continue
-                cnt = int(m.group(1))
-                cat = m.group(2).lower()
-                total += cnt
-                if cat.startswith('yea'):
-                    yeas = cnt
-                elif cat.startswith('nay'):
-                    nays = cnt
-                else:
-                    other += cnt
-
-        # 7) parse the roll-call listing
-        roll_call = []
-        if roll_tbl:
-            rows = roll_tbl.find_all('tr')
-            # skip header row if it has fewer than 2 columns or is empty
-            for tr in rows[1:]:
-                cols = tr.find_all('td')
-                if len(cols) < 2:
-                    continue
-                name = cols[0].get_text(" ", strip=True)
-                resp = cols[1].get_text(" ", strip=True).capitalize()
-                roll_call.append({'name': name, 'response': resp})
-
+        links.append((vote_url, chamber, description))
+    return links
+
+def parse_vote_page(vsoup, session):
+    """Date, counts and roll call from one BillVote.cfm page."""
+    # 4) extract date from <font size="+2"> … on MM-DD
+    date_iso = ''
+    font_tag = vsoup.find('font', {'size': '+2'})
+    if font_tag:
+        header = font_tag.get_text(" ", strip=True)
+        m = re.search(r'on\s+(\d{1,2})-(\d{1,2})(?:-(\d{2,4}))?', header)
+        if m:
+            mm, dd, yy = m.groups()
+            if yy:
+                year = yy if len(yy) == 4 else '20' + yy
+            else:
+                year = session[-4:] if len(session) >= 4 else ''
+            if year:
+                date_iso = f"{int(year):04d}-{int(mm):02d}-{int(dd):02d}"
+
+    # 5) locate the summary & roll-call tables
+    summary_tbl = roll_tbl = None
+    if font_tag:
+        tables = font_tag.find_all_next('table')
+        if len(tables) >= 1:
+            summary_tbl = tables[0]
+        if len(tables) >= 2:
+            roll_tbl = tables[1]
+
+    # 6) parse summary counts
+    yeas = nays = other = total = 0
+    if summary_tbl:
+        tds = summary_tbl.find_all('td')
+        for td in tds:
+            txt = td.get_text(" ", strip=True)
+            m = re.match(r'(\d+)\s+(.+)', txt)
+            if not m:
+                continue
+            cnt = int(m.group(1))
+            cat = m.group(2).lower()
+            total += cnt
+            if cat.startswith('yea'):
+                yeas = cnt
+            elif cat.startswith('nay'):
+                nays = cnt
+            else:
+                other += cnt
+
+    # 7) parse the roll-call listing
+    roll_call = []
+    if roll_tbl:
+        rows = roll_tbl.find_all('tr')
+        # skip header row if it has fewer than 2 columns or is empty
+        for tr in rows[1:]:
+            cols = tr.find_all('td')
+            if len(cols) < 2:
+                continue
+            name = cols[0].get_text(" ", strip=True)
+            resp = cols[1].get_text(" ", strip=True).capitalize()
+            roll_call.append({'name': name, 'response': resp})
+
+    return {
+        'date':      date_iso,
+        'yeas':      yeas,
+        'nays':      nays,
+        'other':     other,
+        'roll_call': roll_call
+    }
+
+def find_vote_links_in(detail_url):
+    """find_vote_links on a detail page, parsing only its vote anchors."""
+    r = fetch(detail_url)
+    soup = BeautifulSoup(r.text, 'html.parser', parse_only=SoupStrainer('a', href=VOTE_LINK))
+    return find_vote_links(soup, detail_url)
+
+def _parse_vote_html(args):
+    html, session = args
+    return parse_vote_page(BeautifulSoup(html, 'html.parser'), session)
+
+def fetch_vote_pages(vote_urls):
+    """
+    vote_urls: {vote_key: vote_url}.  Fetches every distinct vote page
+    concurrently, parses them (in a process pool for large batches) and
+    returns {vote_key: parse_vote_page result}.
+    """
+    keys  = list(vote_urls)
+    pages = fetch_many(vote_urls[k] for k in keys)
+    jobs  = [(page.text, key[0]) for key, page in zip(keys, pages)]
+    if VOTE_WORKERS > 1 and len(jobs) >= MIN_POOL_SIZE:
+        with ProcessPoolExecutor(max_workers=VOTE_WORKERS) as pool:
+            parsed = list(pool.map(_parse_vote_html, jobs, chunksize=16))
+    else:
+        parsed = [_parse_vote_html(job) for job in jobs]
+    return dict(zip(keys, parsed))
+
+def collect_votes(rows):
+    """
+    Vote links of every row's detail page, plus every distinct vote page they
+    point at, fetched and parsed once.
+    Returns ({detail_url: links}, {vote_key: parsed vote page}).
+    """
+    links, vote_urls = {}, {}
+    for row in rows:
+        link    = (row.get('Link') or '').strip()
+        session = row.get('session', '').strip()
+        if not link or link in links:
+            continue
+        links[link] = find_vote_links_in(link)
+        for vote_url, _, _ in links[link]:
+            vote_urls.setdefault(vote_key(session, vote_url), vote_url)
+    return links, fetch_vote_pages(vote_urls)
+
+def assemble_votes(links, session, vote_pages):
+    votes = []
+    for vote_url, chamber, description in links:
+        vote = vote_pages.get(vote_key(session, vote_url))
+        if vote is None:  # link the batch didn't see; fetch it on its own
+            vote = _parse_vote_html((fetch(vote_url).text, session))
         votes.append({
             'chamber':     chamber,
-            'date':        date_iso,
+            'date':        vote['date'],
             'description': description,
-            'yeas':        yeas,
-            'nays':        nays,
-            'other':       other,
-            'roll_call':   roll_call
+            'yeas':        vote['yeas'],
+            'nays':        vote['nays'],
+            'other':       vote['other'],
+            'roll_call':   vote['roll_call']
         })
 
     return votes
 
-def process_votes(input_dir, output_dir):
+def parse_votes(detail_url, session, soup=None, vote_pages=None):
+    """
+    Votes of one bill.  `soup` is the already parsed detail page, if any;
+    `vote_pages` the output of collect_votes / fetch_vote_pages for a batch
+    of bills, otherwise this bill's vote pages are fetched here.
+    """
+    if soup is not None:
+        links = find_vote_links(soup, detail_url)
+    else:
+        links = find_vote_links_in(detail_url)
+    if vote_pages is None:
+        vote_pages = fetch_vote_pages({vote_key(session, u): u for u, _, _ in links})
+    return assemble_votes(links, session, vote_pages)
+
+def process_votes(input_dir, output_dir, resume=True):
     os.makedirs(output_dir, exist_ok=True)
     # process each input JSON file instead of CSV
     for json_path in tqdm(glob.glob(os.path.join(input_dir, 'bills_*.json')), desc="Processing votes"):
-        rows_out = []
         with open(json_path, 'r', encoding='utf8') as rf:
             records = json.load(rf)
-            for row in records:
-                link    = row.get('Link', '').strip()
-                session = row.get('session', '').strip()
-                if link:
-                    row['votes'] = parse_votes(link, session)
-                else:
-                    row['votes'] = []
-                rows_out.append(row)
+        prefetch(row.get('Link', '').strip() for row in records)
+
+        # vote links and vote pages for every bill that isn't checkpointed yet, gathered up front
+        links, vote_pages = {}, {}
+        def collect(pending):
+            found, pages = collect_votes(pending)
+            links.update(found)
+            vote_pages.update(pages)
+
+        def votes_for_row(row):
+            link = row.get('Link', '').strip()
+            if not link:
+                return []
+            return assemble_votes(links[link], row.get('session', '').strip(), vote_pages)
+
+        votes = run_checkpointed("votes", json_path, output_dir, records, votes_for_row,
+                                 source_of=lambda row: page_hash(row.get('Link', '').strip()),
+                                 resume=resume, prepare=collect)
+        rows_out = [{**row, 'votes': v} for row, v in zip(records, votes)]
         # write output JSON preserving filename
         json_name = os.path.basename(json_path)
         out_path  = os.path.join(output_dir, json_name)
@@ -1,5 +1,4 @@
 import json
-import requests
 import os
 import re
 import pandas as pd
@@ -7,6 +6,10 @@ import logging
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import http_client
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -109,11 +112,11 @@ def find_bill_page(session, state_bill_id):
     for year in session_years:
         url = f"https://www.palegis.us/legislation/bills/{year}/{formatted_bill_id}"
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = http_client.get(url, headers=headers, timeout=30)
             if response.status_code == 200:
                 logging.info(f"Found bill page for {state_bill_id} at {url}")
                 return url, BeautifulSoup(response.text, 'lxml')
-        except requests.RequestException as e:
+        except http_client.HTTPError as e:
             logging.error(f"Request failed for {url}: {e}")
     logging.warning(f"Could not find bill page for {state_bill_id} in session {session}")
     return None, None
@@ -174,11 +177,11 @@ def scrape_text(soup, uuid, state_url):
         text_url_absolute = urljoin(state_url, text_url_relative)
 
         try:
-            response = requests.get(text_url_absolute, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
+            response = http_client.get(text_url_absolute, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
             response.raise_for_status()
             cleaned_text = clean_html_bill_text(response.text, uuid)
             write_data(uuid, "text", cleaned_text)
-        except requests.RequestException as e:
+        except http_client.HTTPError as e:
             logging.error(f"[{uuid}] Failed to fetch bill text: {e}")
     else:
         logging.warning(f"[{uuid}] No HTML Bill Text link found.")
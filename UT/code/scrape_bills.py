@@ -1,5 +1,4 @@
 import json
-import requests
 from bs4 import BeautifulSoup
 from dateutil.parser import parse
 import re
@@ -8,6 +7,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import logging
 import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import http_client
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -59,7 +62,7 @@ def get_bill_metadata_1997_2001(uuid, session_year, state_bill_id):
 
     url = f"https://le.utah.gov/~{session_year}/htmdoc/{bill_folder}/{state_bill_id}.htm"
     
-    to_scrape = requests.get(url)
+    to_scrape = http_client.get(url)
     soup = BeautifulSoup(to_scrape.content, 'html.parser')
     
     header_elt = soup.find('h3')
@@ -102,7 +105,7 @@ def get_bill_metadata_2002(uuid, session_year, state_bill_id):
     """
     # Construct the URL for the bill's HTML page.
     url = f"https://le.utah.gov/~{session_year}/bills/static/{state_bill_id}.html"
-    to_scrape = requests.get(url)
+    to_scrape = http_client.get(url)
     soup = BeautifulSoup(to_scrape.content, 'html.parser')
 
     #get title
@@ -169,7 +172,7 @@ def get_bill_history_1997_2001(uuid, session_year, state_bill_id):
         status_folder = "hbillsta"
     status_url = f"https://le.utah.gov/~{session_year}/status/{status_folder}/{state_bill_id}.txt"
     
-    response = requests.get(status_url)
+    response = http_client.get(status_url)
     text_data = response.text
    
     pattern = r"(\d{2}/\d{2}/\d{2})\s+(.+)"
@@ -198,7 +201,7 @@ def get_bill_history_2002(uuid, session_year, state_bill_id):
     # Construct the status URL
     status_url = f"https://le.utah.gov/~{session_year}/status/{status_folder}/{state_bill_id}.txt"
     
-    response = requests.get(status_url)
+    response = http_client.get(status_url)
     text_data = response.text
    
     pattern = r"(\d{2}/\d{2}/\d{2})\s+(.+)"
@@ -280,7 +283,7 @@ def extract_vote_lists(html_content):
     }
 
 def get_votes(uuid,url, session_year,state_bill_id):
-    response = requests.get(url)
+    response = http_client.get(url)
     soup = BeautifulSoup(response.content, 'html.parser')
     links = soup.select("#billStatus a")
     links = [a['href'] for a in links if 'href' in a.attrs]
@@ -289,7 +292,7 @@ def get_votes(uuid,url, session_year,state_bill_id):
         links = [f"https://le.utah.gov{link}" for link in links if "billsta" in link]
         count = 1
         for link in links:
-            response = requests.get(link)
+            response = http_client.get(link)
             text_data = response.text.split()
             
             chamber = 'H' if 'h.txt' in link else 'S'
@@ -378,7 +381,7 @@ def get_votes(uuid,url, session_year,state_bill_id):
         links = [f"https://le.utah.gov{link}" for link in links if "DynaBill" in link]
         count = 1
         for link in links:
-            response = requests.get(link)
+            response = http_client.get(link)
             soup = BeautifulSoup(response.content, 'html.parser')
             if "voice vote" in soup.text:
                 continue
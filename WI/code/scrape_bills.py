@@ -1,5 +1,4 @@
 
-import requests
 from datetime import datetime
 import re
 import json
@@ -10,6 +9,10 @@ import os
 from lxml import html
 from dotenv import load_dotenv
 from openai import OpenAI
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import http_client
 
 BASE_URL = "https://docs.legis.wisconsin.gov/"
 
@@ -30,7 +33,7 @@ def scrape_bill(uuid, state, state_bill_id, session):
     bill_url = (
         "https://docs.legis.wisconsin.gov/{}/proposals/{}".format(session, state_bill_id)
     )
-    response = requests.get(bill_url)
+    response = http_client.get(bill_url)
     tree = html.fromstring(response.content)
 
 
@@ -181,7 +184,7 @@ def scrape_votes(uuid, state, state_bill_id, session, page):
 
     for voting_event, date, chamber in voting_events:
         url = voting_event
-        response = requests.get(url)
+        response = http_client.get(url)
         page = html.fromstring(response.content)
 
         # checking for important votes
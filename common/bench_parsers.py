@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark the state page parsers over a recorded corpus.
+
+The corpus is a record/replay archive (common/http_archive.py): record a
+scraper run once with SCRAPER_HTTP_MODE=record, then point this script at
+the .sqlite file.  Each parser runs over every stored page whose URL
+matches its pattern; parsers that fetch sub-pages themselves (IL votes)
+read them from the same archive, never the network.
+
+For each parser it reports
+  pages/s     best of --repeat passes over the whole corpus (looped to
+              last at least --min-time seconds)
+  peak KiB    largest tracemalloc peak while parsing one page
+  blocks/pg   memory blocks still allocated when the parser returns, with
+              the garbage collector paused (Python keeps no running count of
+              allocations; this is the closest cheap proxy for churn)
+  digest      hash of every result, so a speed-up that changes output shows
+
+--save-baseline stores the numbers next to the archive; later runs compare
+against it and exit non-zero when a parser is slower / bigger by more than
+--tolerance or its output changed.
+
+    python common/bench_parsers.py nv.sqlite --save-baseline
+    python common/bench_parsers.py nv.sqlite --only nv.parse_history_74th --repeat 10
+"""
+import os
+import gc
+import sys
+import json
+import math
+import time
+import hashlib
+import argparse
+import tracemalloc
+import importlib.util
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+from common import http_client
+from common.http_archive import HttpArchive
+
+
+def _nv_history(mod, url, resp):
+    from bs4 import BeautifulSoup
+    return mod.parse_history_74th(BeautifulSoup(resp.text, "html.parser"))
+
+
+def _il_votes(mod, url, resp):
+    return mod.extractVotes(url)
+
+
+def _ut_votes(mod, url, resp):
+    return mod.extract_vote_lists(resp.text)
+
+
+def _wi_history(mod, url, resp):
+    from lxml import html
+    session, _, bill = url.split("/")[-3:]
+    return mod.scrape_bill_history("WI", "WI", bill, session, html.fromstring(resp.content))
+
+
+# name → (module file, module name, URL pattern of its pages, call)
+# The call includes building the soup / tree, as the scrapers do per page.
+PARSERS = {
+    "nv.parse_history_74th": ("NV/code/history.py",     "nv_history",
+                              r"/Session/74th2007/Reports/history\.cfm\?", _nv_history),
+    "il.extractVotes":       ("IL/code/extractInfo.py", "il_extract_info",
+                              r"ilga\.gov/legislation/votehistory/hrollcalls\d+/[^/]+\.html$", _il_votes),
+    "ut.extract_vote_lists": ("UT/code/scrape_bills.py", "ut_scrape_bills",
+                              r"le\.utah\.gov/.*billsta.*(?<!h\.txt)$", _ut_votes),
+    "wi.scrape_bill_history": ("WI/code/scrape_bills.py", "wi_scrape_bills",
+                               r"docs\.legis\.wisconsin\.gov/[^/]+/proposals/[^/]+$", _wi_history),
+}
+
+
+def load_module(rel_path, name):
+    """Import a scraper by path; its own directory goes on sys.path for flat sibling imports."""
+    path = os.path.join(ROOT, rel_path)
+    sys.path.insert(0, os.path.dirname(path))
+    # WI builds its OpenAI client at import time; the parsers never call it
+    os.environ.setdefault("OPENAI_APIKEY", "unused-by-benchmark")
+    os.environ.setdefault("OPENAI_API_KEY", "unused-by-benchmark")
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def load_corpus(archive, url_re, limit=None):
+    pages = []
+    for url, status, headers, content in archive.responses(url_re):
+        if status != 200:
+            continue
+        pages.append((url, http_client.Response(
+            httpx.Response(status, headers=headers, content=content, request=httpx.Request("GET", url)))))
+        if limit and len(pages) >= limit:
+            break
+    return pages
+
+
+def digest(results):
+    return hashlib.sha256(json.dumps(results, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def measure(call, mod, pages, repeat, min_time):
+    # warm-up pass (imports, regex compiles, caches) that also fixes the expected output
+    start = time.perf_counter()
+    results = [call(mod, url, resp) for url, resp in pages]
+    # small corpora are looped so each timed pass lasts at least min_time
+    loops = max(1, math.ceil(min_time / max(time.perf_counter() - start, 1e-6)))
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for url, resp in pages:
+                call(mod, url, resp)
+        best = min(best, (time.perf_counter() - start) / loops)
+
+    blocks = 0
+    gc.collect()
+    gc.disable()
+    try:
+        for url, resp in pages:
+            before = sys.getallocatedblocks()
+            out = call(mod, url, resp)
+            blocks += sys.getallocatedblocks() - before
+            del out
+    finally:
+        gc.enable()
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for url, resp in pages:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            out = call(mod, url, resp)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+            del out
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "pages":         len(pages),
+        "pages_per_sec": len(pages) / best if best else 0.0,
+        "peak_kib":      peak / 1024,
+        "blocks_per_page": blocks / len(pages),
+        "digest":        digest(results),
+    }
+
+
+def regressions(now, base, tolerance):
+    """What got worse than `base` by more than `tolerance`."""
+    flags = []
+    if now["pages_per_sec"] < base["pages_per_sec"] * (1 - tolerance):
+        flags.append(f"slower: {base['pages_per_sec']:.1f} → {now['pages_per_sec']:.1f} pages/s")
+    if now["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+        flags.append(f"more memory: {base['peak_kib']:.0f} → {now['peak_kib']:.0f} KiB peak")
+    if now["blocks_per_page"] > base["blocks_per_page"] * (1 + tolerance):
+        flags.append(f"more blocks: {base['blocks_per_page']:.0f} → {now['blocks_per_page']:.0f} per page")
+    if now["digest"] != base["digest"]:
+        flags.append("output changed")
+    return flags
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("archive", help="recorded corpus (.sqlite from SCRAPER_HTTP_MODE=record)")
+    p.add_argument("--only", action="append", choices=sorted(PARSERS), help="run just these parsers")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--min-time", type=float, default=0.5, help="seconds per timed pass")
+    p.add_argument("--limit", type=int, help="at most this many pages per parser")
+    p.add_argument("--baseline", help="baseline JSON (default: <archive>.baseline.json)")
+    p.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    p.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown / growth")
+    args = p.parse_args()
+    if not os.path.exists(args.archive):
+        sys.exit(f"no archive at {args.archive}")
+
+    baseline_path = args.baseline or args.archive + ".baseline.json"
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf8") as f:
+            baseline = json.load(f)
+
+    # anything a parser fetches comes from the corpus, never the network
+    http_client.configure(mode="replay", archive=args.archive, rate_per_host=0)
+    archive = HttpArchive(args.archive)
+
+    report, flagged = {}, 0
+    print(f"{'parser':<24} {'pages':>6} {'pages/s':>9} {'peak KiB':>9} {'blocks/pg':>10}  digest")
+    for name in args.only or PARSERS:
+        rel_path, mod_name, url_re, call = PARSERS[name]
+        pages = load_corpus(archive, url_re, args.limit)
+        if not pages:
+            print(f"{name:<24} no pages in the corpus")
+            continue
+        try:
+            mod = load_module(rel_path, mod_name)
+        except Exception as e:  # e.g. the state's own dependencies aren't installed
+            print(f"{name:<24} skipped: cannot import {rel_path} ({type(e).__name__}: {e})")
+            continue
+        now = report[name] = measure(call, mod, pages, args.repeat, args.min_time)
+        print(f"{name:<24} {now['pages']:>6} {now['pages_per_sec']:>9.1f} {now['peak_kib']:>9.0f} "
+              f"{now['blocks_per_page']:>10.0f}  {now['digest']}")
+        base = baseline.get(name)
+        if args.save_baseline or base is None:
+            continue
+        if base["pages"] != now["pages"]:
+            print(f"  note: corpus changed ({base['pages']} → {now['pages']} pages), not compared")
+            continue
+        for flag in regressions(now, base, args.tolerance):
+            flagged += 1
+            print(f"  REGRESSION {flag}")
+
+    if args.save_baseline:
+        baseline.update(report)
+        with open(baseline_path, "w", encoding="utf8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"baseline written to {baseline_path}")
+    elif not baseline:
+        print(f"no baseline at {baseline_path}; run with --save-baseline to create one")
+    raise SystemExit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Persistent record of bill-text extractions.
+#
+# One row per output file with its state, bill UUID, input path, the input's
+# SHA-256, the status of the last attempt and when it happened.  Each row is
+# written and committed as its document finishes, so an interrupted run
+# loses nothing.
+#
+# Working out what is already done is then an indexed query, where each run
+# used to walk the whole Dropbox tree with rglob.  The first run for a state
+# with no rows yet scans the tree once (text_extract.scan_outputs) and imports
+# the outputs it finds as status "found".  --rescan first drops finished rows
+# whose output is no longer on disk (so those documents are queued again),
+# then repeats the import, e.g. after outputs were added or deleted by hand.
+#
+# The file is BILL_TEXT_MANIFEST, by default ~/.cache/bill_text/extract_manifest.sqlite.
+# It is kept out of the Dropbox data tree: a synced folder and SQLite's WAL
+# files don't mix.
+#
+#   python common/extract_manifest.py stats ~/.cache/bill_text/extract_manifest.sqlite
+#   python common/extract_manifest.py list  ~/.cache/bill_text/extract_manifest.sqlite --state nv --status failed
+# ──────────────────────────────────────────────────────────────────────────────
+
+# statuses that mean the output file exists and is final
+DONE_STATUSES = ("success", "cached", "copied", "already_exists", "found")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    state       TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    uuid        TEXT,
+    stem        TEXT NOT NULL,
+    input_path  TEXT,
+    content_sha TEXT,
+    status      TEXT NOT NULL,
+    error       TEXT,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (state, output_path)
+);
+CREATE INDEX IF NOT EXISTS extractions_uuid ON extractions (state, uuid);
+CREATE INDEX IF NOT EXISTS extractions_stem ON extractions (state, stem);
+"""
+
+
+class ExtractManifest:
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        return self._conn
+
+    def has_state(self, state):
+        return self.conn.execute("SELECT 1 FROM extractions WHERE state=? LIMIT 1", (state,)).fetchone() is not None
+
+    def record(self, state, output_path, stem, status, uuid=None, input_path=None, content_sha=None, error=None):
+        """Insert or replace the row for output_path, committed immediately."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (state, str(output_path), uuid, stem, input_path, content_sha, status, error, time.time()),
+            )
+
+    def import_outputs(self, state, outputs):
+        """(uuid, stem, output_path) for outputs found on disk; rows already known keep their details."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO extractions (state, output_path, uuid, stem, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'found', ?)",
+                ((state, str(path), uuid, stem, now) for uuid, stem, path in outputs),
+            )
+
+    def forget_missing(self, state):
+        """Delete this state's finished rows whose output file is gone; returns how many."""
+        marks = ",".join("?" * len(DONE_STATUSES))
+        gone = [(state, path) for (path,) in self.conn.execute(
+            f"SELECT output_path FROM extractions WHERE state=? AND status IN ({marks})",
+            (state, *DONE_STATUSES)) if not os.path.exists(path)]
+        with self.conn:
+            self.conn.executemany("DELETE FROM extractions WHERE state=? AND output_path=?", gone)
+        return len(gone)
+
+    def done_uuids(self, state):
+        marks = ",".join("?" * len(DONE_STATUSES))
+        return {u for (u,) in self.conn.execute(
+            f"SELECT DISTINCT uuid FROM extractions WHERE state=? AND uuid IS NOT NULL AND status IN ({marks})",
+            (state, *DONE_STATUSES))}
+
+    def find_output(self, state, stem):
+        """A finished output of this state for an input named `stem`, if it is still on disk."""
+        marks = ",".join("?" * len(DONE_STATUSES))
+        for (path,) in self.conn.execute(
+                f"SELECT output_path FROM extractions WHERE state=? AND stem=? AND status IN ({marks}) "
+                "ORDER BY updated_at", (state, stem, *DONE_STATUSES)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def rows(self, state=None, status=None):
+        q, args = "SELECT state, status, uuid, output_path, error FROM extractions WHERE 1=1", []
+        if state:
+            q += " AND state=?"
+            args.append(state)
+        if status:
+            q += " AND status=?"
+            args.append(status)
+        return self.conn.execute(q + " ORDER BY state, output_path", args)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def main():
+    p = argparse.ArgumentParser(description="Inspect the bill-text extraction manifest")
+    p.add_argument("command", choices=["stats", "list"])
+    p.add_argument("db")
+    p.add_argument("--state", help="only this state")
+    p.add_argument("--status", help="only rows with this status")
+    args = p.parse_args()
+    if not os.path.exists(args.db):
+        sys.exit(f"no manifest at {args.db}")
+
+    manifest = ExtractManifest(args.db)
+    if args.command == "list":
+        for state, status, uuid, path, error in manifest.rows(args.state, args.status):
+            print(f"{state:<4} {status:<14} {uuid or '-':<38} {path}" + (f"  ({error})" if error else ""))
+        return
+
+    counts = {}
+    for state, status, *_ in manifest.rows(args.state, args.status):
+        counts.setdefault(state, {}).setdefault(status, 0)
+        counts[state][status] += 1
+    for state, by_status in sorted(counts.items()):
+        print(f"{state:<4} " + ", ".join(f"{n} {s}" for s, n in sorted(by_status.items())))
+
+
+if __name__ == "__main__":
+    main()
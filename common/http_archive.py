@@ -0,0 +1,160 @@
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Record / replay archive for common.http_client.
+#
+#   SCRAPER_HTTP_MODE=record  every response fetched over the network is also
+#                             written to the archive (last one wins)
+#   SCRAPER_HTTP_MODE=replay  responses are served from the archive only; a
+#                             request that was never recorded raises
+#                             httpx.ConnectError, as if the site were down
+#   SCRAPER_HTTP_ARCHIVE      the SQLite file (default http_archive.sqlite)
+#
+# One row per (method, request URL, body hash) with the status, headers and
+# the zlib-compressed body of the final response.  Redirects are followed
+# when recording and filed under the URL that was asked for, not their
+# target, so replay answers the same request the scraper makes.  A full
+# scraper run can be recorded once and then replayed on a machine with no
+# network to benchmark or profile the parsers.
+# Replay skips the per-host caps and backoff: it is as fast as the disk.
+#
+#   python common/http_archive.py stats http_archive.sqlite
+#   python common/http_archive.py list  http_archive.sqlite --host www.leg.state.nv.us
+# ──────────────────────────────────────────────────────────────────────────────
+
+MODE    = os.environ.get("SCRAPER_HTTP_MODE", "").lower() or None
+ARCHIVE = os.environ.get("SCRAPER_HTTP_ARCHIVE", "http_archive.sqlite")
+MODES   = ("record", "replay")
+
+# content is stored decoded, so these would no longer describe it
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    method      TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    body_sha    TEXT NOT NULL,
+    status      INTEGER NOT NULL,
+    headers     TEXT NOT NULL,
+    content     BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (method, url, body_sha)
+)
+"""
+
+
+def request_key(method, url, body=b""):
+    """(method, request url, sha256 of the request body) – what a response is filed under."""
+    return method.upper(), str(url), hashlib.sha256(body or b"").hexdigest()
+
+
+class HttpArchive:
+    """SQLite response store.  One connection per process and thread; safe to share across a fork."""
+
+    def __init__(self, path=None):
+        self.path = path or ARCHIVE
+        self._local = threading.local()
+        self._pid = None
+
+    def _conn(self):
+        if self._pid != os.getpid():
+            self._local, self._pid = threading.local(), os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            d = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(d, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """(status, [(name, value), ...], content) or None."""
+        row = self._conn().execute(
+            "SELECT status, headers, content FROM responses WHERE method=? AND url=? AND body_sha=?", key
+        ).fetchone()
+        if row is None:
+            return None
+        status, headers, content = row
+        return status, json.loads(headers), zlib.decompress(content)
+
+    def put(self, key, status, headers, content):
+        headers = [(k, v) for k, v in headers if k.lower() not in DROP_HEADERS]
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, status, json.dumps(headers), zlib.compress(content, 6), len(content), time.time()),
+        )
+        conn.commit()
+
+    def responses(self, url_re=None, method="GET"):
+        """(url, status, headers, content) for every stored `method` response whose URL matches, by URL."""
+        urls = [u for (u,) in self._conn().execute(
+            "SELECT url FROM responses WHERE method=? ORDER BY url", (method,))]
+        if url_re is not None:
+            urls = [u for u in urls if re.search(url_re, u)]
+        for url in urls:
+            hit = self.get(request_key(method, url))
+            if hit is not None:
+                yield (url, *hit)
+
+    def rows(self, host=None):
+        q = "SELECT method, url, status, size, length(content) FROM responses"
+        args = ()
+        if host:
+            q += " WHERE url LIKE ?"
+            args = (f"%://{host}/%",)
+        return self._conn().execute(q + " ORDER BY url", args)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _host(url):
+    return url.split("/", 3)[2] if "://" in url else ""
+
+
+def main():
+    p = argparse.ArgumentParser(description="Inspect an HTTP record/replay archive")
+    p.add_argument("command", choices=["stats", "list"])
+    p.add_argument("archive")
+    p.add_argument("--host", help="only this host")
+    args = p.parse_args()
+    if not os.path.exists(args.archive):
+        sys.exit(f"no archive at {args.archive}")
+
+    arc = HttpArchive(args.archive)
+    if args.command == "list":
+        for method, url, status, size, _ in arc.rows(args.host):
+            print(f"{status} {method:<5} {size:>9} {url}")
+        return
+
+    hosts = {}
+    for _, url, status, size, stored in arc.rows(args.host):
+        h = hosts.setdefault(_host(url), [0, 0, 0, 0])
+        h[0] += 1
+        h[1] += size
+        h[2] += stored
+        h[3] += status >= 400
+    print(f"{'host':<32} {'responses':>9} {'errors':>6} {'raw MB':>8} {'stored MB':>9}")
+    for host, (n, raw, stored, errs) in sorted(hosts.items()):
+        print(f"{host:<32} {n:>9} {errs:>6} {raw / 1e6:>8.1f} {stored / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+import os
+import re
+import time
+import atexit
+import random
+import asyncio
+import threading
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import httpx
+from charset_normalizer import from_bytes
+
+from common.http_archive import HttpArchive, request_key, MODE as ARCHIVE_MODE, MODES as ARCHIVE_MODES
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Shared HTTP client for the state scrapers.
+#
+# One pooled keep-alive httpx.AsyncClient with, per host:
+#   - a cap on requests in flight (MAX_PER_HOST) and a token-bucket rate cap
+#     (RATE_PER_HOST requests / second),
+#   - retries on connection errors and RETRY_STATUSES with full-jitter
+#     exponential backoff (a Retry-After header is honoured),
+#   - latency / status / error metrics (print_metrics()),
+#   - optional record / replay against an on-disk archive (common/http_archive.py,
+#     SCRAPER_HTTP_MODE=record|replay) so scraper runs can be repeated offline.
+#
+# AsyncHttpClient is the async API.  HttpClient runs one on a background event
+# loop so plain (and multi-threaded) scripts share its connections and caps;
+# the module-level get()/post() use a process-wide HttpClient.
+#
+# Responses are wrapped to behave like requests.Response (.ok, truthiness,
+# .text decoded the way requests does it), so scrapers port line for line.
+#
+# Scripts import it from the repo root:
+#   sys.path.insert(0, <repo root>); from common import http_client
+# ──────────────────────────────────────────────────────────────────────────────
+
+MAX_PER_HOST   = int(os.environ.get("SCRAPER_MAX_PER_HOST", 10))
+RATE_PER_HOST  = float(os.environ.get("SCRAPER_RATE_PER_HOST", 20))  # requests / second, 0 = no cap
+MAX_RETRIES    = int(os.environ.get("SCRAPER_MAX_RETRIES", 4))
+BACKOFF_BASE   = float(os.environ.get("SCRAPER_BACKOFF_BASE", 1.0))
+BACKOFF_MAX    = 60.0
+TIMEOUT        = float(os.environ.get("SCRAPER_TIMEOUT", 60))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+HTTPError = httpx.HTTPError
+
+# content types whose bodies are not text; encoding_for doesn't sniff these
+BINARY_TYPES = ("application/pdf", "application/octet-stream", "application/zip", "image/", "audio/", "video/")
+
+
+class Response:
+    """httpx.Response with the requests.Response behaviour the scrapers rely on."""
+
+    def __init__(self, resp):
+        self._resp = resp
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.content = resp.content
+        self.url = str(resp.url)
+        self._encoding = None
+        self._text = None
+
+    @property
+    def elapsed(self):
+        try:
+            return self._resp.elapsed
+        except RuntimeError:  # built from stored bytes, never sent
+            return timedelta(0)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"<Response [{self.status_code}]>"
+
+    @property
+    def encoding(self):
+        if self._encoding is None:
+            self._encoding = encoding_for(self.headers, self.content)
+        return self._encoding
+
+    @encoding.setter
+    def encoding(self, value):
+        self._encoding = value
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            try:
+                self._text = str(self.content, self.encoding, errors="replace")
+            except LookupError:
+                self._text = str(self.content, "utf-8", errors="replace")
+        return self._text
+
+    def json(self, **kwargs):
+        return self._resp.json(**kwargs)
+
+    def raise_for_status(self):
+        self._resp.raise_for_status()
+        return self
+
+
+def encoding_for(headers, content):
+    """
+    Same choice as requests: header charset, ISO-8859-1 for text/*, utf-8 for
+    JSON, else sniffed.  PDFs and other binary types are never sniffed.
+    """
+    ctype = headers.get("content-type") or ""
+    m = re.search(r"charset=([^;]+)", ctype, flags=re.I)
+    if m:
+        return m.group(1).strip("'\" ")
+    if ctype.lower().startswith(BINARY_TYPES):
+        return "utf-8"
+    if "text" in ctype:
+        return "ISO-8859-1"
+    if "application/json" in ctype:
+        return "utf-8"
+    best = from_bytes(content).best()
+    return best.encoding if best else "utf-8"
+
+
+class TokenBucket:
+    """`rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostMetrics:
+    """Per-host request counts, retries, errors, status codes and latencies (thread-safe)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _host(self, host):
+        return self.hosts.setdefault(host, {"requests": 0, "errors": 0, "retries": 0,
+                                            "statuses": {}, "latencies": []})
+
+    def record(self, host, seconds, status=None):
+        with self.lock:
+            h = self._host(host)
+            h["requests"] += 1
+            h["latencies"].append(seconds)
+            if status is None:
+                h["errors"] += 1
+            else:
+                h["statuses"][status] = h["statuses"].get(status, 0) + 1
+                if status >= 400:
+                    h["errors"] += 1
+
+    def retry(self, host):
+        with self.lock:
+            self._host(host)["retries"] += 1
+
+    def take(self):
+        """The raw per-host counters, reset to zero (e.g. to hand them from a worker process to its parent)."""
+        with self.lock:
+            hosts, self.hosts = self.hosts, {}
+        return hosts
+
+    def merge(self, hosts):
+        """Add raw per-host counters from take()."""
+        with self.lock:
+            for host, other in hosts.items():
+                h = self._host(host)
+                h["requests"] += other["requests"]
+                h["errors"] += other["errors"]
+                h["retries"] += other["retries"]
+                h["latencies"].extend(other["latencies"])
+                for status, n in other["statuses"].items():
+                    h["statuses"][status] = h["statuses"].get(status, 0) + n
+
+    def summary(self):
+        """{host: {requests, errors, retries, statuses, mean_ms, p50_ms, p95_ms, max_ms}}."""
+        out = {}
+        with self.lock:
+            for host, h in self.hosts.items():
+                lat = sorted(h["latencies"])
+                pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000 if lat else 0.0
+                out[host] = {
+                    "requests": h["requests"],
+                    "errors":   h["errors"],
+                    "retries":  h["retries"],
+                    "statuses": dict(h["statuses"]),
+                    "mean_ms":  sum(lat) / len(lat) * 1000 if lat else 0.0,
+                    "p50_ms":   pct(0.50),
+                    "p95_ms":   pct(0.95),
+                    "max_ms":   lat[-1] * 1000 if lat else 0.0,
+                }
+        return out
+
+    def print(self):
+        rows = self.summary()
+        if not rows:
+            return
+        print(f"{'host':<32} {'reqs':>6} {'errs':>5} {'retry':>5} {'mean ms':>8} {'p50':>7} {'p95':>7} {'max':>7}")
+        for host, s in sorted(rows.items()):
+            print(f"{host:<32} {s['requests']:>6} {s['errors']:>5} {s['retries']:>5} "
+                  f"{s['mean_ms']:>8.0f} {s['p50_ms']:>7.0f} {s['p95_ms']:>7.0f} {s['max_ms']:>7.0f}")
+
+
+def _backoff(attempt, base, resp=None):
+    """Full-jitter exponential backoff, or the server's Retry-After if it asked for longer."""
+    delay = random.uniform(0, min(BACKOFF_MAX, base * 2 ** attempt))
+    retry_after = resp.headers.get("retry-after") if resp is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        delay = max(delay, min(BACKOFF_MAX, float(retry_after)))
+    return delay
+
+
+class AsyncHttpClient:
+    """
+    Async API.  Use from a single event loop:
+
+        async with AsyncHttpClient() as client:
+            pages = await client.get_many(urls)
+    """
+
+    def __init__(self, max_per_host=None, rate_per_host=None, max_retries=None,
+                 backoff_base=None, timeout=None, headers=None, retry_statuses=None,
+                 metrics=None, mode=None, archive=None):
+        self.max_per_host   = max_per_host or MAX_PER_HOST
+        self.rate_per_host  = RATE_PER_HOST if rate_per_host is None else rate_per_host
+        self.max_retries    = MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base   = BACKOFF_BASE if backoff_base is None else backoff_base
+        self.timeout        = timeout or TIMEOUT
+        self.headers        = headers or {}
+        self.retry_statuses = RETRY_STATUSES if retry_statuses is None else set(retry_statuses)
+        self.metrics        = metrics or HostMetrics()
+        self.mode           = ARCHIVE_MODE if mode is None else (mode or None)
+        if self.mode not in (None,) + ARCHIVE_MODES:
+            raise ValueError(f"unknown HTTP mode {self.mode!r}; expected one of {ARCHIVE_MODES}")
+        self.archive        = (archive if isinstance(archive, HttpArchive) else HttpArchive(archive)) if self.mode else None
+        self._client = None
+        self._limits = {}
+
+    @property
+    def client(self):
+        # created on first use so it belongs to the loop that uses it
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, headers=self.headers, follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=None, max_connections=None),
+            )
+        return self._client
+
+    def _limits_for(self, host):
+        if host not in self._limits:
+            bucket = TokenBucket(self.rate_per_host) if self.rate_per_host else None
+            self._limits[host] = (asyncio.Semaphore(self.max_per_host), bucket)
+        return self._limits[host]
+
+    async def request(self, method, url, **kwargs):
+        """
+        One request with the per-host caps and retries; returns a Response
+        (the last one if every attempt got a retryable status) or raises the
+        last connection error.  kwargs go to httpx (params, data, json,
+        headers, timeout, ...).
+        """
+        if self.mode is None:
+            return await self._request(method, url, **kwargs)
+        req = self.client.build_request(method, url, **kwargs)
+        key = request_key(method, req.url, req.read())
+        if self.mode == "replay":
+            return self._replay(key, req)
+        resp = await self._request(method, url, **kwargs)
+        self.archive.put(key, resp.status_code, resp.headers.multi_items(), resp.content)
+        return resp
+
+    def _replay(self, key, req):
+        host = urlsplit(key[1]).netloc
+        start = time.perf_counter()
+        hit = self.archive.get(key)
+        if hit is None:
+            self.metrics.record(host, time.perf_counter() - start)
+            raise httpx.ConnectError(f"replay: {key[0]} {key[1]} is not in {self.archive.path}", request=req)
+        status, headers, content = hit
+        seconds = time.perf_counter() - start
+        self.metrics.record(host, seconds, status)
+        resp = httpx.Response(status, headers=headers, content=content, request=req)
+        resp.elapsed = timedelta(seconds=seconds)
+        return Response(resp)
+
+    async def _request(self, method, url, **kwargs):
+        host = urlsplit(url).netloc
+        sem, bucket = self._limits_for(host)
+        for attempt in range(self.max_retries + 1):
+            resp = None
+            async with sem:
+                if bucket:
+                    await bucket.acquire()
+                start = time.perf_counter()
+                try:
+                    resp = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    self.metrics.record(host, time.perf_counter() - start)
+                    if attempt == self.max_retries:
+                        raise
+                else:
+                    self.metrics.record(host, time.perf_counter() - start, resp.status_code)
+                    if resp.status_code not in self.retry_statuses or attempt == self.max_retries:
+                        return Response(resp)
+            self.metrics.retry(host)
+            await asyncio.sleep(_backoff(attempt, self.backoff_base, resp))
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def get_many(self, urls, return_exceptions=False, **kwargs):
+        """GET every URL concurrently (within the per-host caps), results in input order."""
+        return await asyncio.gather(*(self.get(u, **kwargs) for u in urls),
+                                    return_exceptions=return_exceptions)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class HttpClient:
+    """
+    Thin sync wrapper: an AsyncHttpClient on a background event loop.  Safe to
+    call from any number of threads; they all share one connection pool and
+    one set of per-host caps.
+    """
+
+    def __init__(self, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http-client", daemon=True)
+        self._thread.start()
+        self.aclient = AsyncHttpClient(**kwargs)
+
+    def run(self, coro):
+        """Run a coroutine on the client's loop and wait for its result."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("HttpClient.run() called from its own event loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def request(self, method, url, **kwargs):
+        return self.run(self.aclient.request(method, url, **kwargs))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_many(self, urls, return_exceptions=False, **kwargs):
+        return self.run(self.aclient.get_many(urls, return_exceptions=return_exceptions, **kwargs))
+
+    @property
+    def metrics(self):
+        return self.aclient.metrics
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self.run(self.aclient.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# process-wide client
+# ──────────────────────────────────────────────────────────────────────────────
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # the loop thread doesn't survive fork(); a child process starts its own client
+    global _default, _default_lock
+    _default, _default_lock = None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def default_client():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient()
+            atexit.register(_default.close)
+        return _default
+
+
+def configure(**kwargs):
+    """Replace the process-wide client, e.g. configure(mode="replay", archive=path)."""
+    global _default
+    with _default_lock:
+        old, _default = _default, HttpClient(**kwargs)
+        atexit.register(_default.close)
+    if old is not None:
+        old.close()
+    return _default
+
+
+def request(method, url, **kwargs):
+    return default_client().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return default_client().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return default_client().post(url, **kwargs)
+
+
+def get_many(urls, return_exceptions=False, **kwargs):
+    return default_client().get_many(urls, return_exceptions=return_exceptions, **kwargs)
+
+
+def metrics():
+    return default_client().metrics.summary()
+
+
+def print_metrics():
+    if _default is not None:
+        _default.metrics.print()
@@ -0,0 +1,247 @@
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Adaptive request scheduler for the LLM text-extraction jobs.
+#
+# Instead of a fixed sleep before every file and a fixed Semaphore, each
+# request asks for a slot with its estimated input and output tokens:
+#
+#   async with scheduler.slot(est_in, est_out) as slot:
+#       ... call the API ...
+#       slot.done(headers=resp_headers, usage=(input_tokens, output_tokens))
+#
+# A slot is granted when
+#   - requests / input tokens / output tokens per minute all have budget left
+#     (three token buckets refilling continuously over a minute), and
+#   - fewer than `concurrency` requests are in flight.
+#
+# Budgets start at the configured limits and follow the provider's own
+# numbers as soon as responses carry them (anthropic-ratelimit-* headers).
+# Actual usage replaces the estimate when the request finishes, and the
+# running actual/estimate ratio corrects later estimates.
+#
+# Only rate-limit answers (429, and 529 "overloaded" / Gemini's 503) slow
+# things down; the caller reports them with throttled(), which halves the
+# concurrency and pauses new slots until the server's retry-after (or a
+# jittered backoff) has passed.  After `ramp_every` seconds without one, and
+# with every budget at least a quarter full, concurrency goes back up by one,
+# to max_concurrency.
+# ──────────────────────────────────────────────────────────────────────────────
+
+# anthropic-ratelimit-<name>-{limit,remaining,reset} → bucket
+HEADER_BUCKETS = {"requests": "requests", "input-tokens": "input", "output-tokens": "output"}
+
+
+class Bucket:
+    """`limit` units per minute, refilled continuously; None = unlimited."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.level = float(limit) if limit else 0.0
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.limit:
+            self.level = min(self.limit, self.level + (now - self.updated) * self.limit / 60)
+        self.updated = now
+
+    def wait_for(self, amount):
+        """Seconds until `amount` is available (a request bigger than the whole bucket waits for a full one)."""
+        if not self.limit:
+            return 0.0
+        need = min(amount, self.limit) - self.level
+        return max(0.0, need * 60 / self.limit)
+
+    def take(self, amount):
+        if self.limit:
+            self.level -= amount
+
+    def fullness(self):
+        return 1.0 if not self.limit else max(0.0, self.level) / self.limit
+
+    def sync(self, limit, remaining):
+        """Adopt the server's view: its limit, and never more left than it says."""
+        if limit:
+            if not self.limit:
+                self.level = float(limit)
+            self.limit = limit
+        if remaining is not None and self.limit:
+            self.level = min(self.level, float(remaining))
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _seconds_until(reset):
+    """RFC 3339 timestamp (Anthropic's *-reset headers) → seconds from now."""
+    try:
+        when = datetime.fromisoformat(reset.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_after(headers):
+    """Seconds from a retry-after header, or None."""
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Slot:
+    """One granted request: `async with scheduler.slot(...)` returns it, leaving the block frees it."""
+
+    def __init__(self, scheduler, est_in, est_out):
+        self.scheduler = scheduler
+        self.raw = {"input": est_in, "output": est_out}  # the caller's estimates
+        self.reserved = {}                              # what was taken from the buckets
+
+    async def __aenter__(self):
+        self.reserved = await self.scheduler._acquire(self.raw["input"], self.raw["output"])
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.scheduler._release()
+
+    def done(self, headers=None, usage=None):
+        """Record the outcome of a successful request: response headers and/or (input, output) tokens."""
+        self.scheduler._finish(self, headers, usage)
+
+
+class AdaptiveScheduler:
+
+    def __init__(self, rpm=None, input_tpm=None, output_tpm=None, concurrency=2,
+                 max_concurrency=16, ramp_every=20.0, backoff_base=5.0, backoff_max=120.0, name="llm"):
+        self.buckets = {"requests": Bucket(rpm), "input": Bucket(input_tpm), "output": Bucket(output_tpm)}
+        self.concurrency = max(1, concurrency)
+        self.max_concurrency = max(self.concurrency, max_concurrency)
+        self.ramp_every = ramp_every
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.name = name
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_change = time.monotonic()
+        self.last_cut = float("-inf")
+        self.throttles = 0
+        self.scale = {"input": 1.0, "output": 1.0}  # actual / estimated tokens, smoothed
+        self.stats = {"requests": 0, "throttled": 0, "input_tokens": 0, "output_tokens": 0, "peak_concurrency": 0}
+        self._cond = None
+
+    @property
+    def cond(self):
+        # created on first use so it belongs to the running loop
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def _acquire(self, raw_in, raw_out):
+        """Wait for a free slot and budget; returns the tokens reserved."""
+        async with self.cond:
+            while True:
+                # estimates corrected by what previous requests actually used
+                need_in, need_out = raw_in * self.scale["input"], raw_out * self.scale["output"]
+                now = time.monotonic()
+                for b in self.buckets.values():
+                    b.refill(now)
+                waits = [self.paused_until - now,
+                         self.buckets["requests"].wait_for(1),
+                         self.buckets["input"].wait_for(need_in),
+                         self.buckets["output"].wait_for(need_out)]
+                if self.in_flight < self.concurrency and max(waits) <= 0:
+                    self.buckets["requests"].take(1)
+                    self.buckets["input"].take(need_in)
+                    self.buckets["output"].take(need_out)
+                    self.in_flight += 1
+                    self.stats["peak_concurrency"] = max(self.stats["peak_concurrency"], self.in_flight)
+                    return {"input": need_in, "output": need_out}
+                timeout = max(waits) if self.in_flight < self.concurrency else None
+                try:
+                    await asyncio.wait_for(self.cond.wait(), timeout=max(0.05, timeout) if timeout else None)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self):
+        async with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def slot(self, est_in, est_out):
+        """Async context manager granting one request; see the module comment."""
+        return Slot(self, est_in, est_out)
+
+    def _finish(self, slot, headers, usage):
+        self.stats["requests"] += 1
+        self.throttles = 0  # the backoff streak ends once a request gets through
+        now = time.monotonic()
+        if usage:
+            used_in, used_out = usage
+            self.stats["input_tokens"] += used_in or 0
+            self.stats["output_tokens"] += used_out or 0
+            # charge the difference between what was reserved and what was used
+            for key, used in (("input", used_in), ("output", used_out)):
+                if used is None:
+                    continue
+                self.buckets[key].take(used - slot.reserved.get(key, 0))
+                if slot.raw[key] > 0:
+                    self.scale[key] = 0.8 * self.scale[key] + 0.2 * (used / slot.raw[key])
+        if headers:
+            self._sync_headers(headers)
+        self._maybe_ramp(now)
+
+    def _sync_headers(self, headers):
+        for name, key in HEADER_BUCKETS.items():
+            limit = _int(headers.get(f"anthropic-ratelimit-{name}-limit"))
+            remaining = _int(headers.get(f"anthropic-ratelimit-{name}-remaining"))
+            if limit is None and remaining is None:
+                continue
+            self.buckets[key].sync(limit, remaining)
+            if remaining == 0:
+                wait = _seconds_until(headers.get(f"anthropic-ratelimit-{name}-reset"))
+                if wait:
+                    self.paused_until = max(self.paused_until, time.monotonic() + wait)
+
+    def _maybe_ramp(self, now):
+        if self.concurrency >= self.max_concurrency or now - self.last_change < self.ramp_every:
+            return
+        if self.in_flight < self.concurrency:
+            return  # not concurrency-bound: more slots would not help
+        if all(b.fullness() >= 0.25 for b in self.buckets.values()):
+            self.concurrency += 1
+            self.last_change = now
+            logging.info(f"[{self.name}] headroom left: concurrency → {self.concurrency}")
+
+    async def throttled(self, headers=None, status=None):
+        """A 429/529 came back: halve concurrency and pause new requests for a while."""
+        self.throttles += 1
+        self.stats["throttled"] += 1
+        now = time.monotonic()
+        wait = retry_after(headers)
+        if wait is None:
+            # jittered, so requests rejected together don't all come back at the same moment
+            wait = self.backoff_base * 2 ** min(self.throttles - 1, 6) * random.uniform(0.5, 1.5)
+            wait = min(self.backoff_max, wait)
+        self.paused_until = max(self.paused_until, now + wait)
+        if now - self.last_cut > 1.0:  # one cut per burst of rejections
+            self.concurrency = max(1, self.concurrency // 2)
+            self.last_change = self.last_cut = now
+        logging.warning(f"[{self.name}] rate limited ({status}): pausing {wait:.1f}s, concurrency → {self.concurrency}")
+        async with self.cond:
+            self.cond.notify_all()
+        await asyncio.sleep(wait)
+
+    def summary(self):
+        s = dict(self.stats)
+        s["concurrency"] = self.concurrency
+        return s
@@ -0,0 +1,84 @@
+import os
+import shutil
+import asyncio
+import hashlib
+import tempfile
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Content-addressed cache of extracted bill text.
+#
+# States republish byte-identical PDFs under new version names and UUIDs, and
+# reruns see the same files again.  An answer is filed under
+#
+#   sha256(input bytes, provider, model, prompt, how the input is split)
+#
+# as <cache>/<first two hex digits>/<key>.txt, written once.  A document whose
+# key is already there gets that file hard-linked to its own _html.txt (copied
+# where the filesystem can't link) and is never sent to the API.
+#
+# The cache lives in BILL_TEXT_CACHE, by default ~/.cache/bill_text/extract_cache,
+# so every state and session shares it; it stays out of the synced data tree.
+# Delete the directory to start over.
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def link_or_copy(src, dest):
+    """Make `dest` the same file as `src`, replacing whatever is at dest."""
+    if os.path.exists(dest) and os.path.samefile(src, dest):
+        return  # already linked (rename onto the same file would be a no-op and leave tmp behind)
+    d = os.path.dirname(os.path.abspath(dest))
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".link-")
+    os.close(fd)
+    os.unlink(tmp)
+    try:
+        try:
+            os.link(src, tmp)
+        except OSError:  # other device, or no hard links here
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+class ResultCache:
+
+    def __init__(self, path):
+        self.path = path
+        self._locks = {}
+
+    def key(self, content_sha, cfg):
+        """Cache key for an input whose bytes hash to content_sha, under this state's settings."""
+        split = f"{cfg['long_pdf']}:{cfg['chunk_pages']}" if cfg["input"] != "text" else cfg["text_template"]
+        h = hashlib.sha256()
+        for part in (content_sha, cfg["provider"], cfg["model"], split, cfg["prompt"]):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def entry(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.txt")
+
+    def get(self, key):
+        """Path of the cached answer, or None."""
+        entry = self.entry(key)
+        return entry if os.path.exists(entry) else None
+
+    def put(self, key, text_path):
+        """File text_path's contents under key (linked, so no second copy on disk)."""
+        entry = self.entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        link_or_copy(text_path, entry)
+        return entry
+
+    def lock(self, key):
+        """Held while a key is being produced, so identical documents in one run wait for the first."""
+        return self._locks.setdefault(key, asyncio.Lock())
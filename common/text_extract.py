@@ -0,0 +1,605 @@
+import os
+import io
+import re
+import csv
+import sys
+import base64
+import shutil
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+
+from dotenv import load_dotenv
+from PyPDF2 import PdfReader, PdfWriter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.llm_scheduler import AdaptiveScheduler
+from common.text_cache import ResultCache, file_sha256, link_or_copy
+from common.extract_manifest import ExtractManifest
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Bill-text extraction engine.
+#
+# Every state used to carry its own copy of scrape_text / process_pdf_chunk /
+# main (text/state-scrapers/*_parse.py, text/scrape_text_claude.py,
+# text/scrape_text_gemini.py, AZ/ and GA/code/scrape_text_claude.py).  They
+# now differ only in the rows of STATES below and in their prompt,
+# common/text_prompts/<state>.txt.
+#
+# Requests go through one AdaptiveScheduler per run (common/llm_scheduler.py),
+# which budgets requests and estimated tokens per minute for the provider,
+# follows its rate-limit headers, backs off on 429/529 only and raises
+# concurrency again while there is headroom.  Budgets can be set with
+# CLAUDE_RPM / CLAUDE_INPUT_TPM / CLAUDE_OUTPUT_TPM (GEMINI_* likewise).
+#
+#   python common/text_extract.py nv
+#   python common/text_extract.py mi --concurrency 3 --limit 20
+#   python text/state-scrapers/nv_parse.py          (same thing)
+#
+# Each row of the manifest CSV (UUID,file_path) is one bill document; the
+# model's answer is written next to it as <file>_html.txt.  Answers are also
+# kept in a content-hash cache (common/text_cache.py), so a byte-identical
+# document under another name, UUID or session is never sent twice.  What is
+# done is looked up in the extraction manifest (common/extract_manifest.py)
+# rather than by walking the data tree.
+# ──────────────────────────────────────────────────────────────────────────────
+
+DATA_DIR   = os.environ.get("BILL_TEXT_DIR", "/Users/josephloffredo/MIT Dropbox/Joseph Loffredo/election_bill_text/data")
+PROMPT_DIR = Path(__file__).resolve().parent / "text_prompts"
+# cache and manifest stay on local disk, not in the synced data tree
+LOCAL_DIR   = os.path.join(os.path.expanduser("~"), ".cache", "bill_text")
+CACHE_DIR   = os.environ.get("BILL_TEXT_CACHE", os.path.join(LOCAL_DIR, "extract_cache"))
+MANIFEST_DB = os.environ.get("BILL_TEXT_MANIFEST", os.path.join(LOCAL_DIR, "extract_manifest.sqlite"))
+
+SONNET_4     = "claude-4-sonnet-20250514"
+SONNET_37    = "claude-3-7-sonnet-20250219"
+GEMINI_FLASH = "gemini-2.5-flash-preview-04-17"
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+# Starting per-minute budgets; Claude's are replaced by the limits its response headers report.
+PROVIDER_LIMITS = {
+    "claude": {"rpm": _env_int("CLAUDE_RPM", 1000), "input_tpm": _env_int("CLAUDE_INPUT_TPM", 450000),
+               "output_tpm": _env_int("CLAUDE_OUTPUT_TPM", 90000)},
+    "gemini": {"rpm": _env_int("GEMINI_RPM", 1000), "input_tpm": _env_int("GEMINI_INPUT_TPM", 1000000),
+               "output_tpm": _env_int("GEMINI_OUTPUT_TPM", 0) or None},
+}
+# answers that mean "slow down" rather than "this request failed"
+THROTTLE_STATUSES = {"claude": {429, 529}, "gemini": {429, 503}}
+MAX_THROTTLES = 20            # rate-limit retries per request, on top of max_retries
+
+# token estimates used to budget a request before its usage is known
+PDF_PAGE_TOKENS    = 2000     # input tokens per PDF page (text + page image)
+OUTPUT_PAGE_TOKENS = 700      # marked-up text per PDF page
+CHARS_PER_TOKEN    = 4
+
+# Gemini takes at most ~20 MB per request inline (base64 adds a third); bigger PDFs go through files.upload
+GEMINI_INLINE_MAX = 14 * 1024 ** 2
+
+DEFAULTS = {
+    "provider":           "claude",
+    "model":              SONNET_4,
+    "max_tokens":         64000,
+    "max_retries":        2,
+    "retry_backoff_base": 3,      # seconds; attempt n waits base * (n + 1)
+    "concurrency":        5,      # requests in flight to start with
+    "max_concurrency":    16,     # the scheduler ramps up to this while there is headroom
+    "chunk_pages":        40,
+    "input":              "pdf",  # pdf | rtf (converted with LibreOffice) | text (sent inline)
+    "long_pdf":           "chunk",  # chunk | skip | whole: what to do past chunk_pages
+    "skip":               "uuid_dir",  # how finished bills are recognised, see existing_uuids()
+    "output_suffix":      "_html.txt",
+    "text_template":      "{prompt}\n{text}",
+    "id_column":          "UUID",
+    "path_column":        "file_path",
+    "extensions":         None,   # only manifest paths with these suffixes
+    "status_csv":         None,   # write one row per document here
+    "cache_dir":          CACHE_DIR,  # None: no result cache
+    "manifest_db":        MANIFEST_DB,
+    "rescan":             False,  # forget outputs deleted from disk, re-import the ones there
+}
+
+# Per-state settings on top of DEFAULTS.  `folder` is the state's directory under
+# DATA_DIR; the manifest defaults to text/state-scrapers/<state>_bill_text_files.csv.
+STATES = {
+    "ar": {"folder": "arkansas", "model": SONNET_37, "max_retries": 10, "concurrency": 1,
+           "long_pdf": "whole", "skip": "uuid_prefix"},
+    "ia": {"folder": "iowa", "max_retries": 10, "concurrency": 2, "long_pdf": "skip", "skip": None},
+    "ks": {"folder": "kansas", "max_retries": 10, "concurrency": 2, "long_pdf": "skip", "skip": None},
+    "mi": {"folder": "michigan", "max_retries": 10, "concurrency": 5, "input": "text",
+           "skip": "processed_copy", "output_suffix": "_processed.txt"},
+    "mn": {"folder": "minnesota", "max_retries": 4, "concurrency": 5, "input": "rtf",
+           "long_pdf": "whole", "extensions": (".rtf",)},
+    "mo": {"folder": "missouri", "concurrency": 5},
+    "ms": {"folder": "mississippi", "concurrency": 5},
+    "nd": {"folder": "north_dakota", "max_retries": 3, "concurrency": 6},
+    "ne": {"folder": "nebraska", "concurrency": 6},
+    "nv": {"folder": "nevada", "concurrency": 6},
+    "oh": {"folder": "ohio", "model": SONNET_37, "max_retries": 3, "concurrency": 6},
+    "or": {"folder": "oregon", "concurrency": 6},
+    "az": {"folder": "arizona", "manifest": "AZ/output/az_bill_text_files.csv", "model": SONNET_37,
+           "max_retries": 10, "concurrency": 1, "input": "text",
+           "text_template": "{prompt}\n\nHere is the legislative text:\n\n{text}"},
+    "ga": {"folder": "georgia", "manifest": "GA/output/ga_bill_text_links.csv", "model": SONNET_37,
+           "max_retries": 10, "concurrency": 1, "long_pdf": "whole", "skip": "uuid_prefix",
+           "id_column": "uuid", "path_column": "pdf_path"},
+    # Gemini
+    "ky": {"folder": "kentucky", "provider": "gemini", "model": GEMINI_FLASH, "concurrency": 4,
+           "long_pdf": "skip", "chunk_pages": 80, "skip": None},
+    "la": {"folder": "louisiana", "provider": "gemini", "model": GEMINI_FLASH, "concurrency": 4,
+           "long_pdf": "skip", "chunk_pages": 80},
+    "md": {"folder": "maryland", "provider": "gemini", "model": GEMINI_FLASH, "concurrency": 5,
+           "long_pdf": "skip", "chunk_pages": 80},
+    "az_gemini": {"folder": "arizona", "manifest": "AZ/output/az_bill_text_files.csv", "provider": "gemini",
+                  "model": GEMINI_FLASH, "concurrency": 6, "input": "text", "text_template": "{prompt}\n\n{text}"},
+    "nc": {"folder": "north_carolina", "manifest": "NC/nc_bill_text_files.csv", "provider": "gemini",
+           "model": GEMINI_FLASH, "concurrency": 4, "long_pdf": "whole", "skip": None,
+           "path_column": "pdf_path", "status_csv": "NC/nc_bill_text_status.csv"},
+}
+
+_clients = {}
+
+
+def claude_client():
+    if "claude" not in _clients:
+        from anthropic import AsyncAnthropic
+        load_dotenv()
+        # no SDK retries: 429/529 must reach request_text so the scheduler sees them
+        _clients["claude"] = AsyncAnthropic(api_key=os.getenv('CLAUDE_APIKEY'), max_retries=0)
+    return _clients["claude"]
+
+
+def gemini_client():
+    if "gemini" not in _clients:
+        from google import genai
+        load_dotenv()
+        _clients["gemini"] = genai.Client(api_key=os.getenv('GEMINI_APIKEY'))
+    return _clients["gemini"]
+
+
+def state_config(state, **overrides):
+    """DEFAULTS + STATES[state] + its prompt, with any non-None overrides on top."""
+    if state not in STATES:
+        raise KeyError(f"unknown state {state!r}; known: {', '.join(sorted(STATES))}")
+    cfg = {**DEFAULTS, **STATES[state], "state": state}
+    cfg.setdefault("manifest", f"text/state-scrapers/{state}_bill_text_files.csv")
+    cfg["text_dir"] = Path(DATA_DIR) / cfg["folder"]
+    cfg.update({k: v for k, v in overrides.items() if v is not None})
+    with open(PROMPT_DIR / cfg.get("prompt_file", f"{state}.txt"), encoding="utf-8", newline="") as f:
+        cfg["prompt"] = f.read()
+    return cfg
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# manifest
+# ──────────────────────────────────────────────────────────────────────────────
+
+UUID_PREFIX = re.compile(r"(_\d+_html\.txt)$")
+
+
+def output_uuid(path, cfg):
+    """The UUID an output file counts for under the state's `skip` rule (None if it counts for none)."""
+    path = Path(path)
+    if cfg["skip"] == "uuid_prefix":
+        # <UUID>_<n>_html.txt anywhere under text_dir
+        return UUID_PREFIX.sub("", path.name) if UUID_PREFIX.search(path.name) else None
+    # <text_dir>/<UUID>/..._html.txt
+    return path.parent.name
+
+
+def scan_outputs(cfg):
+    """(uuid, stem, path) of every output on disk under text_dir."""
+    suffix = cfg["output_suffix"]
+    for f in Path(cfg["text_dir"]).rglob(f"*{suffix}"):
+        uuid = output_uuid(f, cfg)
+        if uuid is not None:
+            yield uuid, f.name[:-len(suffix)], os.path.abspath(f)
+
+
+def existing_uuids(cfg, manifest):
+    """UUIDs that already have output, from the extraction manifest (seeded from disk on a state's first run)."""
+    if cfg["skip"] is None:
+        return set()
+    if cfg["rescan"]:
+        gone = manifest.forget_missing(cfg["state"])
+        if gone:
+            logging.info(f"[{cfg['state']}] {gone} recorded outputs are gone from disk; queued again")
+    if cfg["rescan"] or not manifest.has_state(cfg["state"]):
+        logging.info(f"[{cfg['state']}] Scanning {cfg['text_dir']} for existing output...")
+        manifest.import_outputs(cfg["state"], scan_outputs(cfg))
+    if cfg["skip"] == "processed_copy":
+        return set()  # checked per file, by name, in extract_document
+    return manifest.done_uuids(cfg["state"])
+
+
+def read_manifest(cfg, manifest, limit=None):
+    """{document path: UUID} still to do, in manifest order."""
+    done = existing_uuids(cfg, manifest)
+    exts = cfg["extensions"]
+    paths = {}
+    with open(cfg["manifest"], newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            path = (row.get(cfg["path_column"]) or "").strip()
+            if not path or row.get(cfg["id_column"]) in done:
+                continue
+            if exts and not path.lower().endswith(exts):
+                continue
+            if os.path.exists(path):
+                paths.setdefault(path, row.get(cfg["id_column"]))
+    return dict(list(paths.items())[:limit]) if limit else paths
+
+
+def output_path(path, cfg):
+    return f"{os.path.splitext(path)[0]}{cfg['output_suffix']}"
+
+
+def record_result(manifest, cfg, uuid, result):
+    path = result["path"]
+    out = result.get("text_path") or output_path(path, cfg)
+    if cfg["skip"] in ("uuid_dir", "uuid_prefix"):
+        uuid = output_uuid(out, cfg)  # what the next run's skip check will look for
+    manifest.record(cfg["state"], os.path.abspath(out), Path(path).stem, result["status"], uuid=uuid,
+                    input_path=os.path.abspath(path), content_sha=result.get("content_sha"),
+                    error=result.get("error"))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# documents → message content
+# ──────────────────────────────────────────────────────────────────────────────
+
+def convert_rtf_to_pdf(rtf_path):
+    """Convert RTF file to PDF using LibreOffice headless mode"""
+    if platform.system() == "Darwin":
+        libreoffice_cmd = "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+        if not os.path.exists(libreoffice_cmd):
+            logging.error(f"LibreOffice not found at {libreoffice_cmd}")
+            return None
+    elif platform.system() == "Windows":
+        libreoffice_cmd = "soffice"
+    else:
+        libreoffice_cmd = "libreoffice"
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cmd = [libreoffice_cmd, '--headless', '--convert-to', 'pdf', '--outdir', temp_dir, rtf_path]
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            if result.returncode != 0:
+                logging.error(f"LibreOffice conversion failed: {result.stderr}")
+                return None
+            pdf_filename = Path(rtf_path).stem + '.pdf'
+            pdf_path = os.path.join(temp_dir, pdf_filename)
+            if not os.path.exists(pdf_path):
+                logging.error(f"PDF file not created: {pdf_path}")
+                return None
+            # keep the PDF next to the RTF
+            output_pdf_path = os.path.join(os.path.dirname(rtf_path), pdf_filename)
+            shutil.move(pdf_path, output_pdf_path)
+            return output_pdf_path
+    except subprocess.TimeoutExpired:
+        logging.error(f"LibreOffice conversion timeout for {rtf_path}")
+    except Exception as e:
+        logging.error(f"Error converting {rtf_path} to PDF: {e}")
+    return None
+
+
+def pdf_chunks(reader, chunk_pages):
+    """The PDF split into chunk_pages-page PDFs (bytes), in page order."""
+    total = len(reader.pages)
+    chunks = []
+    for start in range(0, total, chunk_pages):
+        writer = PdfWriter()
+        for i in range(start, min(start + chunk_pages, total)):
+            writer.add_page(reader.pages[i])
+        buf = io.BytesIO()
+        writer.write(buf)
+        chunks.append((buf.getvalue(), min(chunk_pages, total - start)))
+    return chunks
+
+
+def document_parts(path, cfg):
+    """
+    What to send for this document, one dict per request: {"text": str} or
+    {"pdf": bytes, "pages": n}.  None when the state skips documents this
+    long.  Long PDFs become one request per chunk, sent concurrently.
+    """
+    if cfg["input"] == "text":
+        with open(path, "r", encoding="utf-8") as f:
+            return [{"text": f.read()}]
+
+    if cfg["input"] == "rtf":
+        logging.info(f"Converting RTF to PDF: {path}")
+        path = convert_rtf_to_pdf(path)
+        if not path:
+            raise RuntimeError("RTF to PDF conversion failed")
+
+    reader = PdfReader(path)
+    total_pages = len(reader.pages)
+    if total_pages > cfg["chunk_pages"] and cfg["long_pdf"] != "whole":
+        if cfg["long_pdf"] == "skip":
+            logging.info(f"Skipping {path}: too long ({total_pages} pages)")
+            return None
+        chunks = pdf_chunks(reader, cfg["chunk_pages"])
+        logging.info(f"Breaking {path} into {len(chunks)} chunks ({total_pages} pages)")
+        return [{"pdf": data, "pages": pages} for data, pages in chunks]
+    with open(path, "rb") as f:
+        return [{"pdf": f.read(), "pages": total_pages}]
+
+
+def estimate_tokens(part, cfg):
+    """(input, output) tokens this request is expected to use, before the scheduler's correction."""
+    prompt = len(cfg["prompt"]) // CHARS_PER_TOKEN
+    if "text" in part:
+        text = len(part["text"]) // CHARS_PER_TOKEN
+        return prompt + text, min(cfg["max_tokens"], text)
+    return (prompt + part["pages"] * PDF_PAGE_TOKENS,
+            min(cfg["max_tokens"], part["pages"] * OUTPUT_PAGE_TOKENS))
+
+
+def combine_responses(responses, pdf_path):
+    """Combine multiple chunk responses into one coherent response"""
+    if len(responses) == 1:
+        return responses[0]
+    title = f"# Combined Analysis for {os.path.basename(pdf_path)}\n\n"
+    return title + "\n\n---\n\n".join(f"## Part {i}\n\n{response}" for i, response in enumerate(responses, 1))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# requests
+# ──────────────────────────────────────────────────────────────────────────────
+
+async def call_claude(part, cfg):
+    """Stream one Claude response → (text, response headers, (input, output) tokens)."""
+    if "text" in part:
+        content = [{"type": "text", "text": cfg["text_template"].format(prompt=cfg["prompt"], text=part["text"])}]
+    else:
+        content = [
+            {"type": "document",
+             "source": {"type": "base64", "media_type": "application/pdf",
+                        "data": base64.b64encode(part["pdf"]).decode("utf-8")}},
+            {"type": "text", "text": cfg["prompt"]},
+        ]
+    async with claude_client().messages.stream(
+        model=cfg["model"],
+        max_tokens=cfg["max_tokens"],
+        messages=[{"role": "user", "content": content}],
+    ) as stream:
+        parts = [chunk async for chunk in stream.text_stream]
+        final = await stream.get_final_message()
+    headers = getattr(getattr(stream, "response", None), "headers", None)
+    return "".join(parts), headers, (final.usage.input_tokens, final.usage.output_tokens)
+
+
+async def call_gemini(part, cfg):
+    """
+    One Gemini response → (text, None, (input, output) tokens).  PDFs are
+    sent inline, or uploaded (and deleted afterwards) past GEMINI_INLINE_MAX.
+    """
+    from google.genai import types
+    client = gemini_client()
+    uploaded = None
+    if "text" in part:
+        contents = [cfg["text_template"].format(prompt=cfg["prompt"], text=part["text"])]
+    elif len(part["pdf"]) > GEMINI_INLINE_MAX:
+        uploaded = await client.aio.files.upload(file=io.BytesIO(part["pdf"]),
+                                                 config={"mime_type": "application/pdf"})
+        contents = [cfg["prompt"], uploaded]
+    else:
+        contents = [cfg["prompt"], types.Part.from_bytes(data=part["pdf"], mime_type="application/pdf")]
+    try:
+        response = await client.aio.models.generate_content(model=cfg["model"], contents=contents)
+    finally:
+        if uploaded is not None:
+            await client.aio.files.delete(name=uploaded.name)
+    meta = response.usage_metadata
+    usage = (meta.prompt_token_count, meta.candidates_token_count) if meta else None
+    return response.text, None, usage
+
+
+PROVIDERS = {"claude": call_claude, "gemini": call_gemini}
+
+
+def _error_status(e):
+    # anthropic: APIStatusError.status_code; google-genai: APIError.code
+    return getattr(e, "status_code", None) or getattr(e, "code", None)
+
+
+async def request_text(part, cfg, scheduler, label):
+    """
+    One model response for one part.  Rate-limit answers go to the scheduler
+    and are retried without counting as failures; other errors are retried
+    max_retries times with linear backoff.
+    """
+    call = PROVIDERS[cfg["provider"]]
+    est_in, est_out = estimate_tokens(part, cfg)
+    attempt = throttles = 0
+    while True:
+        try:
+            async with scheduler.slot(est_in, est_out) as slot:
+                logging.info(f"Requesting {cfg['provider']} response for {label} (attempt {attempt + 1})")
+                text, headers, usage = await call(part, cfg)
+                slot.done(headers=headers, usage=usage)
+                return text
+        except Exception as e:
+            status = _error_status(e)
+            if status in THROTTLE_STATUSES[cfg["provider"]] and throttles < MAX_THROTTLES:
+                throttles += 1
+                await scheduler.throttled(getattr(getattr(e, "response", None), "headers", None), status)
+                continue
+            attempt += 1
+            logging.warning(f"Attempt {attempt} failed for {label}: {e}")
+            if attempt >= cfg["max_retries"]:
+                raise
+            backoff_time = cfg["retry_backoff_base"] * (attempt + 1)
+            logging.info(f"Retrying in {backoff_time}s...")
+            await asyncio.sleep(backoff_time)
+
+
+def write_text(path, text):
+    # replace rather than overwrite: the old file may be hard-linked into the cache
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def restore_cached(entry, path, out_path):
+    """Link the cached answer to out_path; a combined answer is retitled when it names another file."""
+    with open(entry, encoding="utf-8") as f:
+        first = f.readline()
+    title = f"# Combined Analysis for {os.path.basename(path)}\n"
+    if first.startswith("# Combined Analysis for ") and first != title:
+        with open(entry, encoding="utf-8") as f:
+            write_text(out_path, title + f.read()[len(first):])
+    else:
+        link_or_copy(entry, out_path)
+    logging.info(f"Cached result {entry} → {out_path}")
+
+
+async def _extract(path, out_path, cfg, scheduler):
+    # reading, converting and splitting the PDF would block the loop (and every request in flight)
+    parts = await asyncio.to_thread(document_parts, path, cfg)
+    if parts is None:
+        return {"path": path, "status": "skipped"}
+
+    # chunks go out together under the scheduler's budget and come back in page order
+    tasks = [
+        asyncio.create_task(request_text(
+            part, cfg, scheduler, path if len(parts) == 1 else f"chunk {i}/{len(parts)} of {path}"))
+        for i, part in enumerate(parts, 1)
+    ]
+    try:
+        responses = await asyncio.gather(*tasks)
+    except BaseException:
+        # one chunk failing fails the document; don't keep paying for the others
+        for t in tasks:
+            t.cancel()
+        raise
+
+    write_text(out_path, combine_responses(responses, path))
+    logging.info(f"Completed: {path}")
+    return {"path": path, "status": "success", "text_path": out_path}
+
+
+async def extract_document(path, cfg, scheduler, cache=None, manifest=None):
+    out_path = output_path(path, cfg)
+    if cfg["skip"] == "processed_copy":
+        if os.path.exists(out_path):
+            logging.info(f"Processed file already exists: {out_path}")
+            return {"path": path, "status": "already_exists", "text_path": out_path}
+        # the same file name already processed elsewhere in the state (another session folder)
+        existing = manifest and manifest.find_output(cfg["state"], Path(path).stem)
+        if existing:
+            logging.info(f"Copying existing processed file from {existing} to {out_path}")
+            shutil.copy2(existing, out_path)
+            return {"path": path, "status": "copied", "text_path": out_path, "copied_from": str(existing)}
+
+    if cache is None:
+        return await _extract(path, out_path, cfg, scheduler)
+    content_sha = await asyncio.to_thread(file_sha256, path)
+    key = cache.key(content_sha, cfg)
+    async with cache.lock(key):  # an identical document in this run waits here, then hits
+        entry = cache.get(key)
+        if entry:
+            restore_cached(entry, path, out_path)
+            return {"path": path, "status": "cached", "text_path": out_path, "copied_from": entry,
+                    "content_sha": content_sha}
+        result = await _extract(path, out_path, cfg, scheduler)
+        if result["status"] == "success":
+            cache.put(key, out_path)
+        return {**result, "content_sha": content_sha}
+
+
+async def run_jobs(items, worker, concurrency):
+    """
+    The shared concurrency core: worker(item) for every item, at most
+    `concurrency` at a time.  A failure is logged and reported, never raised.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(item):
+        async with semaphore:
+            try:
+                return await worker(item)
+            except Exception as e:
+                logging.error(f"Failed on {item}: {e}")
+                return {"path": item, "status": "failed", "error": str(e)}
+
+    return await asyncio.gather(*(one(item) for item in items))
+
+
+def make_scheduler(cfg):
+    return AdaptiveScheduler(concurrency=cfg["concurrency"], max_concurrency=cfg["max_concurrency"],
+                             name=cfg["state"], **PROVIDER_LIMITS[cfg["provider"]])
+
+
+def write_status(results, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=["path", "status", "text_path", "error", "copied_from"],
+                           extrasaction="ignore")
+        w.writeheader()
+        w.writerows(results)
+
+
+async def extract_state(cfg, limit=None):
+    manifest = ExtractManifest(cfg["manifest_db"])
+    paths = read_manifest(cfg, manifest, limit)
+    scheduler = make_scheduler(cfg)
+    cache = ResultCache(cfg["cache_dir"]) if cfg["cache_dir"] else None
+
+    async def one(path):
+        try:
+            result = await extract_document(path, cfg, scheduler, cache, manifest)
+        except Exception as e:
+            record_result(manifest, cfg, paths[path], {"path": path, "status": "failed", "error": str(e)})
+            raise
+        record_result(manifest, cfg, paths[path], result)
+        return result
+
+    logging.info(f"[{cfg['state']}] Processing {len(paths)} files with {cfg['model']} "
+                 f"({cfg['concurrency']} to {cfg['max_concurrency']} requests at a time)...")
+    # the scheduler paces the requests; this only bounds how many documents are held in memory
+    results = await run_jobs(list(paths), one, 2 * cfg["max_concurrency"])
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    logging.info(f"[{cfg['state']}] " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())))
+    logging.info(f"[{cfg['state']}] scheduler: {scheduler.summary()}")
+    if cfg["status_csv"]:
+        write_status(results, cfg["status_csv"])
+    manifest.close()
+    return results
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Extract marked-up bill text with Claude or Gemini")
+    p.add_argument("state", choices=sorted(STATES))
+    p.add_argument("--manifest", help="CSV of documents (default: the state's *_bill_text_files.csv)")
+    p.add_argument("--text-dir", help="where finished bills are looked up (default: BILL_TEXT_DIR/<state folder>)")
+    p.add_argument("--concurrency", type=int, help="requests in flight to start with")
+    p.add_argument("--max-concurrency", type=int)
+    p.add_argument("--model")
+    p.add_argument("--limit", type=int, help="only the first N pending documents")
+    p.add_argument("--no-cache", action="store_true", help="send every document, even if an identical one was done")
+    p.add_argument("--rescan", action="store_true", help="walk the data folder for existing output again, re-queueing deleted ones")
+    args = p.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    cfg = state_config(args.state, manifest=args.manifest, text_dir=args.text_dir,
+                       concurrency=args.concurrency, max_concurrency=args.max_concurrency,
+                       model=args.model)
+    if args.no_cache:
+        cfg["cache_dir"] = None
+    cfg["rescan"] = args.rescan
+    results = asyncio.run(extract_state(cfg, args.limit))
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,12 @@
-import requests
 import pandas as pd
 from urllib.parse import quote
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import http_client
 
 BASE_URL = "https://api.oregonlegislature.gov/odata/ODataService.svc/"
 LOG_EVERY = 50
@@ -10,13 +14,13 @@ MAX_WORKERS = 10
 
 def get_sessions():
     url = f"{BASE_URL}LegislativeSessions?$format=json"
-    response = requests.get(url)
+    response = http_client.get(url)
     response.raise_for_status()
     return response.json()['value']
 
 def get_measures(session_key):
     url = f"{BASE_URL}Measures?$filter=SessionKey eq '{session_key}'&$format=json"
-    response = requests.get(url)
+    response = http_client.get(url)
     response.raise_for_status()
     return response.json()['value']
 
@@ -36,7 +40,7 @@ def process_measure(session_key, session_name, measure, index, total):
             f"MeasurePrefix eq '{prefix}' and "
             f"MeasureNumber eq {number}&$format=json"
         )
-        response = requests.get(url)
+        response = http_client.get(url)
         response.raise_for_status()
         docs = response.json()['value']
         if docs:
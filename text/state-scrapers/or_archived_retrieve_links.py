@@ -1,8 +1,12 @@
-import requests
 import urllib.parse
 import json
 import time
 import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import http_client
 
 BASE_URL = "https://www.oregonlegislature.gov"
 LIST_ID = "{CA51C8F5-A8FA-4078-B75E-DB5863A1D5C5}"
@@ -59,7 +63,7 @@ def fetch_session(session_name, delay=0.8):
         query_string = "&".join(f"{k}={v}" for k, v in paged_params.items())
         url = f"{BASE_URL}/bills_laws/_layouts/15/inplview.aspx?{query_string}"
 
-        resp = requests.post(url, headers=HEADERS)
+        resp = http_client.post(url, headers=HEADERS)
         if not resp.ok:
             print(f"❌ Failed to fetch page at row {page_row} of {session_name}")
             break